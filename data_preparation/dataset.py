@@ -40,47 +40,56 @@ PROBABILITIES = {
     'Grade': [0.10, 0.20, 0.30, 0.15, 0.10, 0.15] 
 }
 
-# --- 2. Initialize the DataFrame ---
-data = pd.DataFrame()
+def generate_dataset(n_rows=N_ROWS, seed=None):
+    """Generates a synthetic student performance DataFrame with n_rows rows."""
+    rng = np.random.default_rng(seed) if seed is not None else np.random
 
-# --- 3. Generate columns with defined distributions ---
-for col, choices in CHOICES.items():
-    if col in PROBABILITIES:
-        # Use weighted random choice for categorical and discrete numerical data (like Scholarship)
-        data[col] = np.random.choice(choices, size=N_ROWS, p=PROBABILITIES[col])
-    else:
-        # Use uniform random choice (for Age, Study Hours)
-        data[col] = np.random.choice(choices, size=N_ROWS)
+    # --- 2. Initialize the DataFrame ---
+    data = pd.DataFrame()
 
-# --- 4. Introduce Conditional Logic (Making the data 'Smart') ---
+    # --- 3. Generate columns with defined distributions ---
+    for col, choices in CHOICES.items():
+        if col in PROBABILITIES:
+            # Use weighted random choice for categorical and discrete numerical data (like Scholarship)
+            data[col] = rng.choice(choices, size=n_rows, p=PROBABILITIES[col])
+        else:
+            # Use uniform random choice (for Age, Study Hours)
+            data[col] = rng.choice(choices, size=n_rows)
 
-# Identify students who are likely to fail (low study, bad attendance, no project)
-low_perform_mask = (data['Weekly_Study_Hours'] <= 2) & \
-                   (data['Attendance'].isin(['Sometimes', 'Never'])) & \
-                   (data['Project_work'] == 'No')
+    # --- 4. Introduce Conditional Logic (Making the data 'Smart') ---
 
-# Adjust the 'Grade' for these students to be mostly 'D', 'E' or 'Fail'
-# CORRECTED: Updated choices and probabilities to reflect the new D/E/Fail grades
-data.loc[low_perform_mask, 'Grade'] = np.random.choice(
-    ['D', 'E', 'Fail'], size=low_perform_mask.sum(), p=[0.2, 0.3, 0.5]
-)
+    # Identify students who are likely to fail (low study, bad attendance, no project)
+    low_perform_mask = (data['Weekly_Study_Hours'] <= 2) & \
+                       (data['Attendance'].isin(['Sometimes', 'Never'])) & \
+                       (data['Project_work'] == 'No')
 
-# Identify students who are likely to get an 'A' (high study, always attendance, reading)
-high_perform_mask = (data['Weekly_Study_Hours'] >= 7) & \
-                    (data['Attendance'] == 'Always') & \
-                    (data['Reading'] == 'Yes')
+    # Adjust the 'Grade' for these students to be mostly 'D', 'E' or 'Fail'
+    # CORRECTED: Updated choices and probabilities to reflect the new D/E/Fail grades
+    data.loc[low_perform_mask, 'Grade'] = rng.choice(
+        ['D', 'E', 'Fail'], size=low_perform_mask.sum(), p=[0.2, 0.3, 0.5]
+    )
 
-# Adjust the 'Grade' for these students to be mostly 'A' or 'B'
-# CORRECTED: Adjusted weights slightly but kept focus on A/B
-data.loc[high_perform_mask, 'Grade'] = np.random.choice(
-    ['A', 'B', 'C'], size=high_perform_mask.sum(), p=[0.6, 0.3, 0.1]
-)
+    # Identify students who are likely to get an 'A' (high study, always attendance, reading)
+    high_perform_mask = (data['Weekly_Study_Hours'] >= 7) & \
+                        (data['Attendance'] == 'Always') & \
+                        (data['Reading'] == 'Yes')
 
-# --- 5. Export to CSV ---
-output_filename = 'DataSets/student_performance_dummy_data_1000.csv'
-data.to_csv(output_filename, index=False)
+    # Adjust the 'Grade' for these students to be mostly 'A' or 'B'
+    # CORRECTED: Adjusted weights slightly but kept focus on A/B
+    data.loc[high_perform_mask, 'Grade'] = rng.choice(
+        ['A', 'B', 'C'], size=high_perform_mask.sum(), p=[0.6, 0.3, 0.1]
+    )
 
-print(f"Successfully generated {N_ROWS} rows of dummy data.")
-print(f"Data saved to {output_filename}")
-print("\nFirst 5 rows of the generated data:")
-print(data.head())
\ No newline at end of file
+    return data
+
+
+if __name__ == "__main__":
+    # --- 5. Export to CSV ---
+    data = generate_dataset(N_ROWS)
+    output_filename = 'DataSets/student_performance_dummy_data_1000.csv'
+    data.to_csv(output_filename, index=False)
+
+    print(f"Successfully generated {N_ROWS} rows of dummy data.")
+    print(f"Data saved to {output_filename}")
+    print("\nFirst 5 rows of the generated data:")
+    print(data.head())
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import OneHotEncoder
@@ -7,6 +8,10 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import joblib
+import datetime
+import io
+import os
+import time
 
 # Load the generated dummy data
 data = pd.read_csv('DataSets/student_performance_realistic_200.csv')
@@ -46,6 +51,137 @@ print("--- Training Model... ---")
 model.fit(X_train, y_train)
 print("--- Training Complete. ---")
 
+# --- 4b. Compress the Model (optional, on by default) ---
+# A fully grown 100-tree forest is far bigger and slower than 13 discrete
+# features need. Smaller variants are tried (a subset of the trained trees,
+# depth-capped refits, and a small forest distilled from the full model's
+# predictions). They are compared on a validation split carved out of the
+# training data, never on the test set: each recipe is built from a full model
+# fitted on the rest of the training split. The smallest recipe within the
+# tolerances is then rebuilt from the model trained on the whole training split
+# and replaces it, so the test accuracy below stays an unbiased estimate. The
+# full model is kept as ml_model_pipeline_full.pkl.
+#   COMPRESS_MODEL=0                 keep the full model
+#   COMPRESS_GUARD=agreement         'agreement': at least COMPRESS_MIN_AGREEMENT of the validation
+#                                    predictions must equal the full model's
+#                                    'accuracy': validation accuracy may drop by at most
+#                                    COMPRESS_ACCURACY_TOLERANCE
+#                                    'both': both of the above
+#   COMPRESS_ACCURACY_TOLERANCE=0.01
+#   COMPRESS_MIN_AGREEMENT=0.95
+#   COMPRESS_VALIDATION_SIZE=0.25    share of the training split held out for the comparison
+COMPRESS_MODEL = os.environ.get('COMPRESS_MODEL', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+COMPRESS_GUARD = os.environ.get('COMPRESS_GUARD', 'agreement').strip().lower()
+COMPRESS_ACCURACY_TOLERANCE = float(os.environ.get('COMPRESS_ACCURACY_TOLERANCE', '0.01'))
+COMPRESS_MIN_AGREEMENT = float(os.environ.get('COMPRESS_MIN_AGREEMENT', '0.95'))
+COMPRESS_VALIDATION_SIZE = float(os.environ.get('COMPRESS_VALIDATION_SIZE', '0.25'))
+DISTILL_SAMPLES = 20000
+if COMPRESS_GUARD not in ('agreement', 'accuracy', 'both'):
+    raise ValueError(f"COMPRESS_GUARD must be 'agreement', 'accuracy' or 'both', not {COMPRESS_GUARD!r}")
+
+def tree_subset(full_model, n_trees):
+    """The first n_trees of a trained forest (no retraining, same fitted preprocessor)."""
+    forest = full_model.named_steps['classifier']
+    subset = RandomForestClassifier(**forest.get_params())
+    subset.set_params(n_estimators=n_trees)
+    for attribute in ('classes_', 'n_classes_', 'n_features_in_', 'n_outputs_'):
+        setattr(subset, attribute, getattr(forest, attribute))
+    subset.estimator_ = forest.estimator_
+    subset.estimators_ = forest.estimators_[:n_trees]
+    return Pipeline(steps=[('preprocessor', full_model.named_steps['preprocessor']), ('classifier', subset)])
+
+def depth_capped(n_trees, max_depth, X_fit, y_fit):
+    return Pipeline(steps=[
+        ('preprocessor', clone(preprocessor)),
+        ('classifier', RandomForestClassifier(n_estimators=n_trees, max_depth=max_depth,
+                                              random_state=42, class_weight='balanced'))
+    ]).fit(X_fit, y_fit)
+
+def distilled(full_model, n_trees, max_depth, X_fit):
+    """Student forest trained on the full model's labels for sampled inputs."""
+    rng = np.random.default_rng(42)
+    synthetic = pd.DataFrame({
+        col: rng.choice(X_fit[col].to_numpy(), size=DISTILL_SAMPLES) for col in X_fit.columns
+    })
+    inputs = pd.concat([X_fit, synthetic], ignore_index=True)
+    return Pipeline(steps=[
+        ('preprocessor', clone(preprocessor)),
+        ('classifier', RandomForestClassifier(n_estimators=n_trees, max_depth=max_depth, random_state=42))
+    ]).fit(inputs, full_model.predict(inputs))
+
+# name -> recipe(full model, X_fit, y_fit) returning a fitted pipeline
+COMPRESSION_RECIPES = {'full (100 trees)': lambda full_model, X_fit, y_fit: full_model}
+for n_trees in (10, 25, 50):
+    COMPRESSION_RECIPES[f'first {n_trees} trees'] = (
+        lambda full_model, X_fit, y_fit, n=n_trees: tree_subset(full_model, n))
+for n_trees, max_depth in ((25, 6), (25, 10), (50, 8), (50, 12)):
+    COMPRESSION_RECIPES[f'{n_trees} trees, depth {max_depth}'] = (
+        lambda full_model, X_fit, y_fit, n=n_trees, d=max_depth: depth_capped(n, d, X_fit, y_fit))
+for n_trees, max_depth in ((10, 8), (25, 10)):
+    COMPRESSION_RECIPES[f'distilled {n_trees} trees, depth {max_depth}'] = (
+        lambda full_model, X_fit, y_fit, n=n_trees, d=max_depth: distilled(full_model, n, d, X_fit))
+
+def profile_model(pipeline, X_eval, y_eval, reference_predictions):
+    """Accuracy, agreement with the full model, pickle size, load time and latency."""
+    buffer = io.BytesIO()
+    joblib.dump(pipeline, buffer)
+    payload = buffer.getvalue()
+    started = time.perf_counter()
+    joblib.load(io.BytesIO(payload))
+    load_seconds = time.perf_counter() - started
+
+    single_row = X_eval.iloc[[0]]
+    latencies = []
+    for _ in range(50):
+        started = time.perf_counter()
+        pipeline.predict(single_row)
+        latencies.append(time.perf_counter() - started)
+
+    predictions = pipeline.predict(X_eval)
+    return {
+        'accuracy': accuracy_score(y_eval, predictions),
+        'agreement': float(np.mean(predictions == reference_predictions)),
+        'size_kb': len(payload) / 1024,
+        'load_ms': load_seconds * 1000,
+        'predict_ms': float(np.median(latencies)) * 1000,
+    }
+
+if COMPRESS_MODEL:
+    print(f"\n--- Compressing Model ({COMPRESS_GUARD} guard, validated on {COMPRESS_VALIDATION_SIZE:.0%} "
+          "of the training split)... ---")
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=COMPRESS_VALIDATION_SIZE, random_state=42, stratify=y_train)
+    reference = clone(model).fit(X_fit, y_fit)
+    reference_predictions = reference.predict(X_val)
+
+    results = {
+        name: profile_model(recipe(reference, X_fit, y_fit), X_val, y_val, reference_predictions)
+        for name, recipe in COMPRESSION_RECIPES.items()
+    }
+    full = results['full (100 trees)']
+    for result in results.values():
+        agreement_ok = result['agreement'] >= COMPRESS_MIN_AGREEMENT
+        accuracy_ok = result['accuracy'] >= full['accuracy'] - COMPRESS_ACCURACY_TOLERANCE
+        result['accepted'] = {'agreement': agreement_ok, 'accuracy': accuracy_ok,
+                              'both': agreement_ok and accuracy_ok}[COMPRESS_GUARD]
+
+    print(f"{'model':<32}{'val acc':>10}{'agreement':>11}{'size KB':>10}{'load ms':>10}{'predict ms':>12}  ok")
+    for name, result in results.items():
+        print(f"{name:<32}{result['accuracy']:>10.4f}{result['agreement']:>11.3f}{result['size_kb']:>10.1f}"
+              f"{result['load_ms']:>10.2f}{result['predict_ms']:>12.3f}  {'yes' if result['accepted'] else 'no'}")
+
+    chosen = min((name for name, result in results.items() if result['accepted']),
+                 key=lambda name: results[name]['size_kb'])
+    if chosen != 'full (100 trees)':
+        # Same recipe, built from the model trained on the whole training split
+        joblib.dump(model, 'ml_model_pipeline_full.pkl')
+        model = COMPRESSION_RECIPES[chosen](model, X_train, y_train)
+        print(f"✅ Using '{chosen}': {full['size_kb'] / results[chosen]['size_kb']:.1f}x smaller, "
+              f"{full['predict_ms'] / results[chosen]['predict_ms']:.1f}x faster per prediction "
+              "(full model saved as ml_model_pipeline_full.pkl)")
+    else:
+        print("No compressed model met the tolerances; keeping the full model.")
+
 # --- 5. Evaluate Model ---
 y_pred = model.predict(X_test)
 accuracy = accuracy_score(y_test, y_pred)
@@ -85,4 +221,26 @@ importance_df = pd.DataFrame({
 print("\nTop 10 Feature Importances (for Study Plan Design):\n")
 print(importance_df)
 # Save importance for visual in /predict
-joblib.dump(importance_df, 'ml_feature_importance.pkl')
\ No newline at end of file
+joblib.dump(importance_df, 'ml_feature_importance.pkl')
+
+# --- Reference distributions for drift monitoring ---
+# Per-feature value proportions of the training split. The web app compares the
+# live histograms of incoming records against these (PSI / chi-square).
+def feature_value_key(value):
+    """Histogram bucket for a value (must match app/core/drift.py)."""
+    if pd.isna(value):
+        return ''
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value).strip()
+
+feature_reference = {
+    'created_at': datetime.datetime.utcnow().isoformat(),
+    'n_rows': len(X_train),
+    'features': {
+        col: X_train[col].map(feature_value_key).value_counts(normalize=True).to_dict()
+        for col in X_train.columns
+    }
+}
+joblib.dump(feature_reference, 'ml_feature_reference.pkl')
+print("✅ Feature reference distributions saved as ml_feature_reference.pkl")
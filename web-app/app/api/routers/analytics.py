@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from ...core.database import get_db
+from ...core import cache, config
+from ...crud import crud_student
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+    include_in_schema=True
+)
+
+@router.get("/group-by")
+def group_by(request: Request, column: str, by: str = "Grade", db: Session = Depends(get_db)):
+    """Record counts for every (column, by) value pair, e.g. ?column=Attendance&by=Grade."""
+    for name in (column, by):
+        if name not in crud_student.GROUPABLE_COLUMNS:
+            raise HTTPException(status_code=422, detail=f"Cannot group by '{name}'")
+
+    def render():
+        counts = crud_student.group_counts(db, column, by)
+        return JSONResponse({
+            "column": column,
+            "by": by,
+            "counts": {str(value): {str(k): n for k, n in row.items()} for value, row in counts.items()},
+        })
+
+    return cache.cached_response(request, ["students"], render)
+
+@router.get("/snapshot")
+def snapshot_stats(db: Session = Depends(get_db)):
+    """Size, memory use and refresh time of the in-memory columnar snapshot."""
+    if not config.COLUMNAR_CACHE_ENABLED:
+        raise HTTPException(status_code=404, detail="Columnar snapshot is disabled (COLUMNAR_CACHE_ENABLED)")
+    from ...core import columnar
+    return columnar.get_snapshot(db).stats()
\ No newline at end of file
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from ...core.database import get_db
+from ...core import cache, ml_artifacts
+from ...crud import crud_drift
+
+router = APIRouter(
+    tags=["Monitoring"],
+    include_in_schema=True
+)
+
+@router.get("/drift")
+def get_feature_drift(request: Request, db: Session = Depends(get_db)):
+    """PSI and chi-square drift of live student records against the training data."""
+    ml_artifacts.load_artifacts()
+
+    def render():
+        return JSONResponse(crud_drift.current_drift_report(db))
+
+    return cache.cached_response(request, ["students", "model"], render)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ...core import metrics
+
+router = APIRouter(
+    tags=["Observability"],
+    include_in_schema=False
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_view():
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
\ No newline at end of file
@@ -1,77 +1,57 @@
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-import joblib
-import pandas as pd
-import numpy as np 
-import os
-import sys
-from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+import time
+from ...core import ml_artifacts, metrics, cache, shadow
+from ...core.templating import templates
 
 router = APIRouter()
 
-# Setup templates and static files
-templates = Jinja2Templates(directory="templates")
-
-# Define the path to artifacts relative to the project root
-# NOTE: Ensure the directory structure (app/ml_artifacts) is correctly accessible from where FastAPI is run
-ANCHOR_DIR = Path(__file__).resolve().parent
-PROJECT_ROOT = ANCHOR_DIR.parent.parent
-ARTIFACTS_DIR = PROJECT_ROOT / 'ml_artifacts'
-
-# ARTIFACTS_PATH = os.path.join(os.path.dirname(__file__), '..', 'ml_artifacts')
-
-# Load ML components once at startup
-ML_PIPELINE = None
-ML_METRICS = {'accuracy': 0.0, 'report': 'N/A', 'feature_names': []}
-ML_IMPORTANCE = pd.DataFrame()
-
-try:
-    # Adjust paths based on the expected location of the artifacts
-    pipeline_path = ARTIFACTS_DIR / 'ml_model_pipeline.pkl'
-    metrics_path = ARTIFACTS_DIR / 'ml_metrics.pkl'
-    importance_path = ARTIFACTS_DIR / 'ml_feature_importance.pkl'
-    
-    # pipeline_path = os.path.join(ARTIFACTS_PATH, '..\..\ml_artifacts\ml_model_pipeline.pkl')
-    # metrics_path = os.path.join(ARTIFACTS_PATH, '..\..\ml_artifacts\ml_metrics.pkl')
-    # importance_path = os.path.join(ARTIFACTS_PATH, '..\..\ml_artifacts\ml_feature_importance.pkl')
-    
-    ML_PIPELINE = joblib.load(pipeline_path)
-    ML_METRICS.update(joblib.load(metrics_path))
-    ML_IMPORTANCE = joblib.load(importance_path)
-    
-    # Ensure importance is sorted for UI display
-    if not ML_IMPORTANCE.empty:
-        ML_IMPORTANCE = ML_IMPORTANCE.sort_values(by='importance', ascending=False).head(5)
-
-except FileNotFoundError:
-    print(f"WARNING: ML model files not found in {ARTIFACTS_PATH}. Please run train_model.py first.")
-    # Keep the default empty/safe values
+# ML components are loaded by the lifespan warm-up (see app.main) or, at the
+# latest, by the first request that needs them. pandas/joblib/scikit-learn are
+# therefore not imported when this module is.
+async def ensure_artifacts_loaded():
+    """Waits for the ML artifacts without blocking the event loop."""
+    if not ml_artifacts.is_loaded():
+        await run_in_threadpool(ml_artifacts.load_artifacts)
+    # Canary split / promotions made through another worker
+    if shadow.state_changed():
+        await run_in_threadpool(shadow.sync)
 
 # --- 2. /predict Endpoint (GET for Form) ---
 @router.get("/predict", response_class=HTMLResponse)
 async def predict_page(request: Request):
     """Renders the prediction form page with model performance metrics."""
-    context = {
-        "request": request,
-        "features": ML_METRICS.get('feature_names', []),
-        "title": "Predict Student Grade",
-        # Ensure 'importance' is passed as a list of dicts for Jinja2
-        "importance": ML_IMPORTANCE.to_dict('records'),
-        "accuracy": f"{ML_METRICS.get('accuracy', 0.0) * 100:.2f}%"
-    }
-    return templates.TemplateResponse(
-        "pages/predict.html", context)
+    await ensure_artifacts_loaded()
+
+    def render():
+        ML_METRICS = ml_artifacts.ML_METRICS
+        context = {
+            "request": request,
+            "features": ML_METRICS.get('feature_names', []),
+            "title": "Predict Student Grade",
+            # Ensure 'importance' is passed as a list of dicts for Jinja2
+            "importance": ml_artifacts.ML_IMPORTANCE.to_dict('records'),
+            "accuracy": f"{ML_METRICS.get('accuracy', 0.0) * 100:.2f}%"
+        }
+        return templates.TemplateResponse(
+            "pages/predict.html", context)
+
+    # Only changes when the model is swapped
+    return cache.cached_response(request, ["model"], render)
 
 @router.get("/visuals", response_class=HTMLResponse)
-async def predict_page(request: Request):
-    """Renders the prediction form page with model performance metrics."""
-    context = {
-        "request": request,
-        "title": "Analytical Data Exploration: Student Performance"
-    }
-    return templates.TemplateResponse(
-        "pages/visuals.html", context)
+async def visuals_page(request: Request):
+    """Renders the analytical data exploration page (data is fetched client-side)."""
+    def render():
+        context = {
+            "request": request,
+            "title": "Analytical Data Exploration: Student Performance"
+        }
+        return templates.TemplateResponse(
+            "pages/visuals.html", context)
+
+    return cache.cached_response(request, [], render)
 
 # --- 3. /predict Endpoint (POST for Prediction) ---
 @router.post("/predict")
@@ -92,9 +72,14 @@ async def make_prediction(
     Project_work: str = Form(...)
 ):
     """Processes form data and returns a grade prediction and recommendation."""
+    await ensure_artifacts_loaded()
+    ML_PIPELINE = ml_artifacts.ML_PIPELINE
+    ML_IMPORTANCE = ml_artifacts.ML_IMPORTANCE
     if ML_PIPELINE is None:
         return {"error": "Model not loaded. Please ensure ML artifacts exist and are accessible."}, 500
     
+    import pandas as pd
+
     try:
         # 1. Create a DataFrame from the form inputs
         input_data = pd.DataFrame([{
@@ -113,11 +98,30 @@ async def make_prediction(
             'Project_work': Project_work
         }])
         
-        # 2. Get prediction
-        predicted_grade_encoded = ML_PIPELINE.predict(input_data)[0]
-        
-        # 3. Get probability 
-        predicted_proba = ML_PIPELINE.predict_proba(input_data).max()
+        # 2. Get prediction (from the candidate model for canaried requests)
+        pipeline, served_by = shadow.choose_pipeline(ML_PIPELINE)
+        early_exit = ml_artifacts.ML_EARLY_EXIT if served_by == "live" else None
+        started = time.perf_counter()
+        approximate = False
+        if early_exit is not None:
+            # Stops evaluating trees once the grade is settled; also yields the confidence
+            with metrics.ML_INFERENCE.time(operation="predict_early_exit"):
+                predicted_grade_encoded, predicted_proba, trees = early_exit.predict_one(input_data)
+            metrics.ML_TREES_EVALUATED.observe(trees)
+            # Mean over the trees that ran, not the full forest's probability
+            approximate = trees < early_exit.n_trees
+            predict_seconds = time.perf_counter() - started
+        else:
+            with metrics.ML_INFERENCE.time(operation="predict"):
+                predicted_grade_encoded = pipeline.predict(input_data)[0]
+            predict_seconds = time.perf_counter() - started
+
+            # 3. Get probability 
+            with metrics.ML_INFERENCE.time(operation="predict_proba"):
+                predicted_proba = pipeline.predict_proba(input_data).max()
+
+        # Compare with the other model off the response path
+        shadow.submit(input_data, served_by, predicted_grade_encoded, predict_seconds)
         
     except Exception as e:
         # Catch errors during conversion or prediction
@@ -152,5 +156,6 @@ async def make_prediction(
     return {
         "predicted_grade": predicted_grade_encoded,
         "recommendation": recommendation,
-        "confidence": f"{predicted_proba * 100:.2f}%"
+        "confidence": f"{predicted_proba * 100:.2f}%",
+        "approximate": approximate,
     }
\ No newline at end of file
@@ -0,0 +1,52 @@
+import secrets
+
+from fastapi import APIRouter, Body, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from ...core import config, shadow
+
+router = APIRouter(
+    prefix="/models",
+    tags=["Models"],
+    include_in_schema=True
+)
+
+def _authorize(request: Request):
+    """Changing the serving model requires the admin token; without one configured it is disabled."""
+    if not config.MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model administration is disabled (MODEL_ADMIN_TOKEN is not set)")
+    supplied = request.headers.get("X-Admin-Token", "")
+    if not secrets.compare_digest(supplied.encode("latin-1", "replace"),
+                                  config.MODEL_ADMIN_TOKEN.encode("latin-1", "replace")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("/shadow")
+async def shadow_report():
+    """Live vs. candidate agreement, per-class disagreement and latency (of the worker that answers)."""
+    await run_in_threadpool(shadow.sync)
+    return shadow.report()
+
+@router.post("/candidate/reload")
+async def reload_candidate(request: Request):
+    """Loads (or unloads) ml_model_pipeline_candidate.pkl in every worker and resets the comparison stats."""
+    _authorize(request)
+    found = await run_in_threadpool(shadow.publish_candidate)
+    if not found:
+        raise HTTPException(status_code=404, detail="No candidate model found")
+    return shadow.report()
+
+@router.post("/candidate/canary")
+def set_canary(request: Request, percent: float = Body(..., embed=True, ge=0, le=100)):
+    """Sets the percentage of /predict requests answered by the candidate (in every worker)."""
+    _authorize(request)
+    shadow.set_canary_percent(percent)
+    return shadow.report()
+
+@router.post("/candidate/promote")
+async def promote_candidate(request: Request):
+    """Makes the candidate the live model in every worker without restarting the app."""
+    _authorize(request)
+    try:
+        final = await run_in_threadpool(shadow.promote)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"promoted": final, "current": shadow.report()}
\ No newline at end of file
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+from ...core import config, profiling
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["Observability"],
+    include_in_schema=False
+)
+
+def _authorize(request: Request):
+    """Listing and downloads always require the profiling token."""
+    if not profiling.token_ok(request.headers.get(config.PROFILING_HEADER)):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+@router.get("/")
+def list_profiles_view(request: Request):
+    """Lists saved request profiles, newest first."""
+    _authorize(request)
+    return {"profiles": profiling.list_profiles()}
+
+@router.get("/{profile_id}.folded")
+def download_folded_profile(profile_id: str, request: Request):
+    """Folded stacks for flamegraph.pl / speedscope / inferno."""
+    _authorize(request)
+    path = profiling.profile_path(profile_id, ".folded")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
+
+@router.get("/{profile_id}.json")
+def download_profile_summary(profile_id: str, request: Request):
+    """Timing summary and SQL statements of a profiled request."""
+    _authorize(request)
+    path = profiling.profile_path(profile_id, ".json")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
\ No newline at end of file
@@ -1,7 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from ...core.database import get_db
+from ...core import cache, config, metrics, upload_validation
 from ...crud import crud_student
+from ...schemas.student import StudentDataCreateList
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     tags=["Student"],
@@ -10,18 +22,183 @@ router = APIRouter(
 
 @router.get("/student-data", include_in_schema=True)
 def get_student_data(
+    request: Request,
     db: Session = Depends(get_db),
     limit: int = 100,  # <-- Defined as a function argument, with a default value
     offset: int = 0    # <-- Defined as a function argument, with a default value
 ):
     """Renders the page to view all student data records, with pagination support."""
     
-    # Fetch data using the CRUD function, passing the limit and offset
-    # Note: Use the function arguments (limit, offset) instead of a fixed number
-    students = crud_student.get_students(db, limit=limit, offset=offset)
-    
-    return {
-        "students": students,
-        "limit": limit,
-        "offset": offset
-    }
\ No newline at end of file
+    def render():
+        # Fetch data using the CRUD function, passing the limit and offset
+        # Note: Use the function arguments (limit, offset) instead of a fixed number
+        students = crud_student.get_students(db, limit=limit, offset=offset)
+        
+        return JSONResponse(jsonable_encoder({
+            "students": students,
+            "limit": limit,
+            "offset": offset
+        }))
+
+    # The /visuals page pulls every batch on each visit; serve them from cache between writes
+    return cache.cached_response(request, ["students"], render)
+
+# --- Bulk ingest ---
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+def _validate_batch(items: list):
+    """
+    Validates a batch with one list-level adapter call. Returns the valid
+    records, their positions in `items` and {position: [error, ...]}.
+    Only a batch with errors is validated a second time (its valid items).
+    """
+    try:
+        return StudentDataCreateList.validate_python(items), list(range(len(items))), {}
+    except ValidationError as e:
+        invalid = {}
+        for error in e.errors(include_url=False):
+            position, *field = error["loc"]
+            label = ".".join(str(part) for part in field)
+            invalid.setdefault(position, []).append(f"{label}: {error['msg']}" if label else error["msg"])
+        positions = [i for i in range(len(items)) if i not in invalid]
+        return StudentDataCreateList.validate_python([items[i] for i in positions]), positions, invalid
+
+def _ingest(db: Session, items: list, offset: int, chunk_size: int, results: list, parse_errors: dict = None,
+            skip_duplicates: bool = False):
+    """Validates `items`, inserts the valid ones in chunked transactions and appends per-record statuses."""
+    records, positions, invalid = _validate_batch(items)
+    invalid.update(parse_errors or {})
+    outcome = crud_student.import_student_records(db, records, chunk_size=chunk_size, skip_duplicates=skip_duplicates)
+    duplicates = {positions[i] for i in outcome["duplicate_positions"]}
+
+    for position in range(len(items)):
+        if position in invalid:
+            results.append({"index": offset + position, "status": "invalid", "errors": invalid[position]})
+        elif position in duplicates and skip_duplicates:
+            results.append({"index": offset + position, "status": "duplicate"})
+        elif position in duplicates:
+            results.append({"index": offset + position, "status": "created", "duplicate": True})
+        else:
+            results.append({"index": offset + position, "status": "created"})
+
+async def _ndjson_batches(request: Request, batch_size: int):
+    """Yields (items, parse_errors) batches while the NDJSON body is still streaming in."""
+    buffer = b""
+    items, parse_errors = [], {}
+
+    def add(line: bytes):
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            parse_errors[len(items)] = ["Invalid JSON"]
+            items.append(None)
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                add(line)
+            if len(items) >= batch_size:
+                yield items, parse_errors
+                items, parse_errors = [], {}
+    if buffer.strip():
+        add(buffer)
+    if items:
+        yield items, parse_errors
+
+async def _array_batches(items: list, batch_size: int):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size], {}
+
+@router.post("/student-data/bulk", include_in_schema=True)
+async def bulk_create_student_data(request: Request, skip_duplicates: bool = False, db: Session = Depends(get_db)):
+    """
+    Creates many student records in one request.
+
+    Accepts a JSON array (Content-Type: application/json) or newline-delimited
+    JSON (application/x-ndjson), which is processed while it streams in.
+    Records are validated and inserted a batch at a time, each batch in its own
+    transaction. The response lists a status per input record: created,
+    duplicate or invalid. Records with the same answers as a stored one are
+    created and flagged "duplicate": true, or skipped with status "duplicate"
+    when ?skip_duplicates=true.
+
+    A JSON array over BULK_MAX_RECORDS is refused before anything is stored.
+    A stream is only counted as it arrives, so there the first BULK_MAX_RECORDS
+    records are processed and the rest is refused (413). That response, and
+    the 500 of a batch that failed, still carry the results of the committed
+    records with "truncated": true; records after them were not processed.
+    """
+    started = time.perf_counter()
+    batch_size = crud_student.IMPORT_CHUNK_SIZE
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    results: list = []
+    received = 0
+    status_code, detail = 200, None
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        batches = _ndjson_batches(request, batch_size)
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body is not valid JSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=422, detail="Expected a JSON array of student records")
+        if len(items) > config.BULK_MAX_RECORDS:
+            raise HTTPException(status_code=413, detail=f"At most {config.BULK_MAX_RECORDS} records per request")
+        batches = _array_batches(items, batch_size)
+
+    try:
+        async for items, parse_errors in batches:
+            room = config.BULK_MAX_RECORDS - received
+            if len(items) > room:
+                items = items[:room]
+                parse_errors = {position: errors for position, errors in parse_errors.items() if position < room}
+                status_code = 413
+                detail = (f"At most {config.BULK_MAX_RECORDS} records per request; "
+                          f"records after the first {config.BULK_MAX_RECORDS} were not processed")
+            if items:
+                await run_in_threadpool(_ingest, db, items, received, batch_size, results, parse_errors,
+                                        skip_duplicates)
+                received += len(items)
+            if status_code != 200:
+                break
+    except ClientDisconnect:
+        raise
+    except Exception:
+        logger.exception("Bulk ingest failed after %s records", received)
+        db.rollback()
+        status_code = 500
+        detail = f"Processing failed after {received} records; only the records listed in results were processed"
+
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    metrics.IMPORT_ROWS.inc(counts["created"], result="imported")
+    metrics.IMPORT_ROWS.inc(counts["duplicate"], result="duplicate")
+    metrics.IMPORT_ROWS.inc(counts["invalid"], result="failed")
+    metrics.IMPORT_DURATION.observe(time.perf_counter() - started)
+
+    body = {"received": received, **counts, "truncated": status_code != 200, "results": results}
+    if status_code != 200:
+        return JSONResponse(status_code=status_code, content={"detail": detail, **body})
+    return body
+
+@router.post("/student-data/validate", include_in_schema=True)
+async def validate_student_csv(csv_file: UploadFile = File(...)):
+    """
+    Dry run of a CSV import: per-column profile (nulls, out-of-domain values,
+    distributions) and the first bad rows. Nothing is written.
+    """
+    content = await csv_file.read()
+    started = time.perf_counter()
+    report = await run_in_threadpool(upload_validation.validate_csv, content)
+    elapsed = time.perf_counter() - started
+    if report["header_error"]:
+        raise HTTPException(status_code=422, detail=report["header_error"])
+    report["bytes"] = len(content)
+    report["seconds"] = round(elapsed, 4)
+    report["mb_per_second"] = round(len(content) / 2**20 / elapsed, 2) if elapsed else None
+    return report
\ No newline at end of file
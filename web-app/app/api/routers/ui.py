@@ -1,18 +1,25 @@
-from fastapi import Query, APIRouter, Request, Depends, Form, UploadFile, File
+from fastapi import Query, APIRouter, HTTPException, Request, Depends, Form, UploadFile, File
 from fastapi.responses import RedirectResponse, Response, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from ...core.database import get_db
+from ...core import config, metrics, cache, upload_validation, write_buffer
 from ...crud import crud_item
 from ...crud import crud_student
 from ...schemas.item import ItemCreate
 from io import StringIO
+from urllib.parse import urlencode
+import base64
 import csv
-import pandas as pd
-from ...schemas.student import StudentDataCreate, StudentDataInDB
+import datetime
+import logging
+import time
+from ...schemas.student import StudentDataCreate, StudentDataInDB, STUDENT_FIELD_CHOICES
+from ...core.templating import stream_template, templates
 from starlette.status import HTTP_303_SEE_OTHER
-from ...crud.data_entry_email import log_email_invitation, get_email_logs
-import requests
+from starlette.concurrency import run_in_threadpool
+from ...crud.data_entry_email import log_email_invitation, get_email_logs_page, count_email_logs_by_status
+from ...crud import data_import
+from ...crud import crud_drift
 import json
 
 EXPECTED_HEADERS = [
@@ -22,7 +29,10 @@ EXPECTED_HEADERS = [
     'Listening_in_Class', 'Project_work', 'Grade'
 ]
 
-templates = Jinja2Templates(directory="templates")
+# Cap on row numbers listed back to the user after an import
+MAX_REPORTED_ROWS = 100
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     tags=["UI Rendering"],
@@ -47,21 +57,29 @@ def get_dataset_schema():
 
 @router.get("/", response_class=HTMLResponse, name="home")
 async def dashboard_view(request: Request, db: Session = Depends(get_db)):
-    # 1. Calculate Metrics
-    data_quality_metrics = crud_student.calculate_data_quality_metrics(db) 
-    
-    # 2. Get Schema Data
-    schema_data = get_dataset_schema()
-    
-    return templates.TemplateResponse(
-        "pages/index.html",
-        {
-            "request": request,
-            "title": "Dashboard & Data Quality",
-            "metrics": data_quality_metrics,
-            "schema": schema_data  # Pass the schema data
-        }
-    )
+    def render():
+        # 1. Calculate Metrics
+        data_quality_metrics = crud_student.calculate_data_quality_metrics(db) 
+        
+        # 2. Get Schema Data
+        schema_data = get_dataset_schema()
+
+        # 3. Feature drift against the training data (None when disabled)
+        drift_report = crud_drift.current_drift_report(db) if config.DRIFT_ENABLED else None
+        
+        return templates.TemplateResponse(
+            "pages/index.html",
+            {
+                "request": request,
+                "title": "Dashboard & Data Quality",
+                "metrics": data_quality_metrics,
+                "schema": schema_data,  # Pass the schema data
+                "drift": drift_report
+            }
+        )
+
+    # Metrics only change when student records are written (drift also on model swaps)
+    return cache.cached_response(request, ["students", "model"], render)
 
 
 @router.post("/create/")
@@ -79,18 +97,78 @@ async def create_item_ui(
 
 
 
+DATA_PAGE_SIZES = (25, 50, 100, 250, 500)
+
+def encode_cursor(key) -> str:
+    """Opaque page cursor for (sort value, Student_ID)."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, student_id = json.loads(base64.urlsafe_b64decode(padded))
+        return value, int(student_id)
+    except (ValueError, TypeError):
+        return None
+
+def parse_student_filters(query_params) -> dict:
+    """Equality filters from the query string, cast to the column type; bad values are ignored."""
+    filters = {}
+    for name in STUDENT_FIELD_CHOICES:
+        raw = query_params.get(name)
+        if raw in (None, ""):
+            continue
+        try:
+            filters[name] = StudentData.__table__.c[name].type.python_type(raw)
+        except (ValueError, TypeError):
+            continue
+    return filters
+
 @router.get("/data", tags=["UI Rendering"])
-def view_data_table(request: Request, db: Session = Depends(get_db)):
-    """Renders the page to view all student data records."""
-    
-    # Fetch data using the CRUD function
-    students = crud_student.get_students(db, limit=1000) # Limit to 50 records for display
-    
-    return templates.TemplateResponse(
-        "pages/student_data_table.html", 
-        {"request": request, "title": "Student Performance Data", "students": students}
+def view_data_table(
+    request: Request,
+    db: Session = Depends(get_db),
+    limit: int = 50,
+    sort: str = "Student_ID",
+    order: str = "asc",
+    after: str = None,
+    before: str = None,
+):
+    """Renders one page of student records (keyset pagination, SQL-side sorting/filtering)."""
+    limit = min(max(limit, 1), max(DATA_PAGE_SIZES))
+    if sort not in crud_student.SORTABLE_COLUMNS:
+        sort = "Student_ID"
+    descending = order == "desc"
+    filters = parse_student_filters(request.query_params)
+
+    page = crud_student.get_students_page(
+        db,
+        limit=limit,
+        sort=sort,
+        descending=descending,
+        filters=filters,
+        after=decode_cursor(after) if after else None,
+        before=decode_cursor(before) if before else None,
     )
 
+    # Query string shared by every navigation link (filters, sort, page size)
+    base_params = {"limit": limit, "sort": sort, "order": "desc" if descending else "asc", **filters}
+    return stream_template(templates, "pages/student_data_table.html", {
+        "request": request,
+        "title": "Student Performance Data",
+        "students": page["rows"],
+        "filters": filters,
+        "filter_choices": STUDENT_FIELD_CHOICES,
+        "sort": sort,
+        "order": base_params["order"],
+        "limit": limit,
+        "page_sizes": DATA_PAGE_SIZES,
+        "base_query": urlencode(base_params),
+        "filter_query": urlencode({"limit": limit, **filters}),
+        "next_cursor": encode_cursor(page["next"]) if page["next"] else None,
+        "prev_cursor": encode_cursor(page["prev"]) if page["prev"] else None,
+    })
+
 @router.get("/data/import", tags=["UI Rendering"])
 def import_data_page(request: Request):
     """Renders the file upload form page."""
@@ -123,6 +201,8 @@ def download_template():
 async def upload_and_import_data(
     request: Request,
     csv_file: UploadFile = File(...), 
+    dry_run: bool = Form(False),
+    skip_duplicates: bool = Form(False),
     db: Session = Depends(get_db)
 ):
     # Ensure the file is a CSV
@@ -132,7 +212,32 @@ async def upload_and_import_data(
             {"request": request, "title": "Bulk Data Import", "error": "Invalid file type. Please upload a .csv file."}
         )
 
+    import pandas as pd  # Heavy import, deferred to first upload
+
     content = await csv_file.read()
+
+    # Dry run: vectorized validation and column profile only, no database access
+    if dry_run:
+        report = await run_in_threadpool(upload_validation.validate_csv, content, MAX_REPORTED_ROWS)
+        if report["header_error"]:
+            return templates.TemplateResponse(
+                "pages/data_import.html",
+                {"request": request, "title": "Bulk Data Import", "error": report["header_error"]}
+            )
+        return templates.TemplateResponse(
+            "pages/data_import.html",
+            {"request": request, "title": "Bulk Data Import", "validation": report, "filename": csv_file.filename}
+        )
+
+    # A file that was already imported completely is a no-op (safe retries)
+    checksum = data_import.file_checksum(content)
+    previous_import = data_import.get_import_by_checksum(db, checksum)
+    if previous_import is not None and previous_import.status == "COMPLETED":
+        return templates.TemplateResponse(
+            "pages/data_import.html",
+            {"request": request, "title": "Bulk Data Import", "previous_import": previous_import}
+        )
+
     csv_data = StringIO(content.decode("utf-8"))
     
     # Use pandas to easily load and inspect headers
@@ -157,27 +262,72 @@ async def upload_and_import_data(
             {"request": request, "title": "Bulk Data Import", "error": error_msg}
         )
 
+    # Claim the checksum before writing anything: a concurrent upload of the same
+    # file (retry after a timeout) sees the claim instead of importing it twice
+    claimed, previous_import = data_import.claim_import(db, checksum, csv_file.filename)
+    if claimed is None:
+        return templates.TemplateResponse(
+            "pages/data_import.html",
+            {"request": request, "title": "Bulk Data Import", "previous_import": previous_import}
+        )
+
     # 2. DATA LOADING AND Pydantic VALIDATION (Crucial Step)
-    imported_count = 0
     errors = []
+    valid_records = []
+    row_numbers = []
+    import_start = time.perf_counter()
     
     for index, row in df.iterrows():
         try:
             # Create a Pydantic model instance for row validation
             # .to_dict() converts the pandas series (row) to a dict
-            student_data = StudentDataCreate(**row.to_dict()) 
-            
-            # If validation succeeds, load data into the database
-            crud_student.create_student_record(db=db, record=student_data)
-            imported_count += 1
+            valid_records.append(StudentDataCreate(**row.to_dict()))
+            row_numbers.append(index + 2)
         except Exception as e:
-            # Log specific validation or DB error for that row
+            # Log specific validation error for that row
             errors.append(f"Row {index + 2} (ID: {row.get('Student_ID', 'N/A')}): {e}")
 
-    if errors:
+    # Chunked, set-based insert; rows identical to stored records are reported
+    # (and only skipped when the uploader asked for it). Retrying a PARTIAL or
+    # FAILED import of this file (a taken-over claim) would find the rows its
+    # earlier attempt stored, so those are skipped too.
+    skip_duplicates = skip_duplicates or claimed.created_at != claimed.updated_at
+    try:
+        result = crud_student.import_student_records(db, valid_records, skip_duplicates=skip_duplicates)
+        imported_count = result["imported"]
+        duplicate_rows = [row_numbers[position] for position in result["duplicate_positions"]]
+
+        data_import.record_import(
+            db,
+            checksum=checksum,
+            filename=csv_file.filename,
+            row_count=len(df),
+            imported_count=imported_count,
+            duplicate_count=len(duplicate_rows),
+            error_count=len(errors),
+        )
+    except Exception:
+        data_import.release_import(db, claimed)
+        raise
+
+    metrics.IMPORT_ROWS.inc(imported_count, result="imported")
+    if skip_duplicates:
+        metrics.IMPORT_ROWS.inc(len(duplicate_rows), result="duplicate")
+    metrics.IMPORT_ROWS.inc(len(errors), result="failed")
+    metrics.IMPORT_DURATION.observe(time.perf_counter() - import_start)
+
+    if errors or duplicate_rows:
          return templates.TemplateResponse(
             "pages/data_import.html", 
-            {"request": request, "title": "Bulk Data Import", "imported_count": imported_count, "errors": errors}
+            {
+                "request": request,
+                "title": "Bulk Data Import",
+                "imported_count": imported_count,
+                "errors": errors,
+                "duplicate_count": len(duplicate_rows),
+                "duplicate_rows": duplicate_rows[:MAX_REPORTED_ROWS],
+                "duplicates_skipped": skip_duplicates,
+            }
         )
         
     # 3. SUCCESS REDIRECT
@@ -246,8 +396,14 @@ async def submit_student_record_view(
         return RedirectResponse(url="/data/add", status_code=303)
 
 
-    # 2. Save data into the database using CRUD
-    crud_student.create_student_record(db=db, record=student_data)
+    # 2. Save data into the database using CRUD (or in a shared group commit)
+    if config.GROUP_COMMIT_ENABLED:
+        try:
+            await write_buffer.WRITER.add(student_data)
+        except TimeoutError:
+            raise HTTPException(status_code=503, detail="The server is busy; your submission was not saved, please retry")
+    else:
+        crud_student.create_student_record(db=db, record=student_data)
     
     # 3. Redirect back to the data table on success
     if is_invitee:
@@ -255,7 +411,9 @@ async def submit_student_record_view(
     return RedirectResponse(url="/data", status_code=303)
 
 async def send_email(recipient: str, form_link: str):
-    url = "https://n8n.prasadsawant.com/webhook/send-data-collection-invite-email"
+    import requests  # Deferred: only needed when invitations are sent
+
+    url = config.INVITE_WEBHOOK_URL
 
     payload = json.dumps({
         "email": recipient,
@@ -269,30 +427,81 @@ async def send_email(recipient: str, form_link: str):
     if response.status_code >= 200 and response.status_code < 300:
         try:
             response_data = response.json()
-            print(f"Request Status Code: {response.status_code}")
-            print(f"Response Data: {response_data}")
+            logger.debug("Invite webhook status %s: %s", response.status_code, response_data)
             return True
         
         except json.JSONDecodeError:
-            print("Error: Could not decode response as JSON.")
+            logger.warning("Invite webhook response could not be decoded as JSON.")
             return False
     else:
         # Handle non-successful HTTP status codes
-        print(f"Error: Request failed with status code {response.status_code}")
+        logger.warning("Invite webhook request failed with status code %s", response.status_code)
         # You can return the response text or status code for debugging
         return False
 
 # --- GET Route: Displays the Email Log table ---
+EMAIL_LOG_STATUSES = ("SENT", "FAILED")
+
+def encode_log_cursor(key) -> str:
+    """Opaque page cursor for (send_time, id)."""
+    send_time, log_id = key
+    return encode_cursor((send_time.isoformat(), log_id))
+
+def decode_log_cursor(cursor: str):
+    key = decode_cursor(cursor)
+    if key is None:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(key[0]), key[1]
+    except (TypeError, ValueError):
+        return None
+
 @router.get("/email_log", response_class=HTMLResponse, name="email_log")
-async def email_log_view(request: Request, db: Session = Depends(get_db)):
-    """Displays the log of sent email invitations by fetching data from the DB."""
-    
-    logs = get_email_logs(db) # Use the CRUD function
-    
-    return templates.TemplateResponse(
-        "pages/email_log_table.html",
-        {"request": request, "title": "Invitation Log", "logs": logs}
+def email_log_view(
+    request: Request,
+    db: Session = Depends(get_db),
+    limit: int = 50,
+    status: str = None,
+    recipient: str = None,
+    after: str = None,
+    before: str = None,
+):
+    """Displays one page of the invitation log (keyset pagination on send_time, id)."""
+    limit = min(max(limit, 1), max(DATA_PAGE_SIZES))
+    status = status if status in EMAIL_LOG_STATUSES else None
+    recipient = recipient.strip() if recipient and recipient.strip() else None
+
+    page = get_email_logs_page(
+        db,
+        limit=limit,
+        status=status,
+        recipient=recipient,
+        after=decode_log_cursor(after) if after else None,
+        before=decode_log_cursor(before) if before else None,
     )
+    status_counts = count_email_logs_by_status(db, recipient=recipient)
+
+    base_params = {"limit": limit}
+    if status:
+        base_params["status"] = status
+    if recipient:
+        base_params["recipient"] = recipient
+    return stream_template(templates, "pages/email_log_table.html", {
+        "request": request,
+        "title": "Invitation Log",
+        "logs": page["rows"],
+        "status": status,
+        "recipient": recipient,
+        "statuses": EMAIL_LOG_STATUSES,
+        "status_counts": status_counts,
+        "total_count": sum(status_counts.values()),
+        "limit": limit,
+        "page_sizes": DATA_PAGE_SIZES,
+        "base_query": urlencode(base_params),
+        "recipient_query": urlencode({"limit": limit, **({"recipient": recipient} if recipient else {})}),
+        "next_cursor": encode_log_cursor(page["next"]) if page["next"] else None,
+        "prev_cursor": encode_log_cursor(page["prev"]) if page["prev"] else None,
+    })
 
 # --- POST Route: Handles email sending and logging ---
 @router.post("/send_invitations", name="send_invitations")
@@ -0,0 +1,170 @@
+"""
+HTTP response cache with strong ETags.
+
+Responses of read-mostly pages are keyed by an ETag derived from the data they
+depend on:
+  - "model":    the SHA-256 of the loaded pipeline (ml_artifacts.MODEL_VERSION)
+  - "students": the student table's change marker, read from the database
+                (row count, highest Student_ID and the "students" counter in
+                data_versions that edits and deletes bump), so every worker
+                computes the same ETag for the same data
+
+Every ETag also carries the build version: APP_VERSION (or the checked-out git
+commit) plus hashes of the templates and static files, so a deploy that
+changes the HTML doesn't keep answering 304 for the old pages.
+
+A matching If-None-Match gets a 304 without rendering anything, and other hits
+are served from an in-process LRU (bounded by entry count and TTL). Writes call
+invalidate("students"), which drops the affected entries and forces the next
+request to re-read the table marker. The marker is otherwise re-read at most
+every CACHE_VERSION_TTL_SECONDS, so writes made by other workers show up
+within that window.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from . import config
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, tuple]" = OrderedDict()  # etag -> (expires, tags, status, body, media_type, headers)
+_students_marker = {"value": None, "checked": 0.0}
+_build_version: Optional[str] = None
+
+TEMPLATES_DIR = Path("templates")
+REPOSITORY_DIR = Path(__file__).resolve().parents[3]
+
+
+def invalidate(tag: str):
+    """Called after writes: evicts the tag's entries (and re-reads the students marker)."""
+    with _lock:
+        if tag == "students":
+            _students_marker["checked"] = 0.0
+        for etag in [etag for etag, entry in _entries.items() if tag in entry[1]]:
+            del _entries[etag]
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def _git_revision() -> str:
+    """Commit of the checkout (deploys are a `git pull`), read without running git."""
+    try:
+        head = (REPOSITORY_DIR / ".git" / "HEAD").read_text().strip()
+        if head.startswith("ref: "):
+            return (REPOSITORY_DIR / ".git" / head[5:]).read_text().strip()
+        return head
+    except OSError:
+        return ""
+
+
+def build_version() -> str:
+    """Version of the code, templates and static files; computed once per process."""
+    global _build_version
+    if _build_version is None:
+        from . import static_assets
+
+        digest = hashlib.sha1((config.APP_VERSION or _git_revision()).encode())
+        for path, fingerprint in sorted(static_assets.manifest().items()):
+            digest.update(f"{path}={fingerprint}\n".encode())
+        if TEMPLATES_DIR.is_dir():
+            for path in sorted(TEMPLATES_DIR.rglob("*.html")):
+                digest.update(f"{path.as_posix()}={static_assets.file_fingerprint(path)}\n".encode())
+        _build_version = digest.hexdigest()[:16]
+    return _build_version
+
+
+def _students_version() -> str:
+    now = time.monotonic()
+    if _students_marker["value"] is None or now - _students_marker["checked"] > config.CACHE_VERSION_TTL_SECONDS:
+        from sqlalchemy import func, select
+        from .database import SessionLocal
+        from ..crud import data_version
+        from ..models.student import StudentData
+
+        with SessionLocal() as db:
+            count, high_water, changes = db.execute(select(
+                func.count(), func.max(StudentData.Student_ID), data_version.get_version_query("students"),
+            ).select_from(StudentData)).one()
+        _students_marker.update(value=f"{count}.{high_water or 0}.{changes or 0}", checked=now)
+    return _students_marker["value"]
+
+
+def _model_version() -> str:
+    from . import ml_artifacts
+
+    return ml_artifacts.MODEL_VERSION
+
+
+VERSION_SOURCES = {
+    "students": _students_version,
+    "model": _model_version,
+}
+
+
+def compute_etag(request: Request, tags: Iterable[str]) -> str:
+    parts = [request.method, str(request.url), f"build={build_version()}"]
+    parts.extend(f"{tag}={VERSION_SOURCES[tag]()}" for tag in sorted(tags))
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def cached_response(request: Request, tags: Iterable[str], build: Callable[[], Response],
+                    max_age: Optional[int] = None) -> Response:
+    """
+    Returns a 304, a cached copy or a freshly built response for this request.
+    `build` must return a fully rendered (non-streaming) Response.
+    """
+    if not config.CACHE_ENABLED:
+        return build()
+
+    tags = tuple(tags)
+    etag = compute_etag(request, tags)
+    max_age = config.CACHE_MAX_AGE if max_age is None else max_age
+    validators = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}, must-revalidate" if max_age else "private, no-cache",
+    }
+
+    if _if_none_match(request, etag):
+        return Response(status_code=304, headers=validators)
+
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(etag)
+        if entry is not None and entry[0] > now:
+            _entries.move_to_end(etag)
+        elif entry is not None:
+            del _entries[etag]
+            entry = None
+    if entry is not None:
+        _, _, status, body, media_type, headers = entry
+        return Response(content=body, status_code=status, media_type=media_type, headers={**headers, **validators})
+
+    response = build()
+    response.headers.update(validators)
+    if response.status_code == 200:
+        headers = {key: value for key, value in response.headers.items()
+                   if key.lower() not in ("content-length", "etag", "cache-control", "set-cookie")}
+        with _lock:
+            _entries[etag] = (now + config.CACHE_TTL_SECONDS, tags, response.status_code,
+                              response.body, response.media_type, headers)
+            _entries.move_to_end(etag)
+            while len(_entries) > config.CACHE_MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return response
@@ -0,0 +1,308 @@
+"""
+In-process columnar snapshot of student_performance_records for analytics.
+
+Each column is a NumPy array: categorical text columns as small integer codes
+(-1 = NULL) plus their category list, numeric columns as float arrays (NaN =
+NULL) and Record_Hash as the first 64 bits of the fingerprint. Aggregations
+are np.bincount / np.unique over the codes instead of GROUP BY queries.
+
+refresh() first reads the table's row count, highest Student_ID and the
+"students" change counter (data_versions, bumped by updates) in one query; if
+they match the last refresh nothing is read. Otherwise it re-reads the rows
+above high_water - REFRESH_OVERLAP_IDS and appends the ones it doesn't have,
+which picks up lower IDs whose transactions committed late. The snapshot is
+rebuilt from scratch when the change counter moved, the highest Student_ID
+went below the mark (table reset), or the rows it holds up to that ID don't
+add up to the row count (deletes, or a late commit older than the window).
+So it sees inserts, deletes and the app's updates; a direct UPDATE that
+doesn't bump the counter is only seen after a restart.
+
+Enabled with COLUMNAR_CACHE_ENABLED; numpy is only imported when it is.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.student import StudentData as StudentModel
+
+CATEGORICAL_COLUMNS = (
+    'Sex', 'High_School_Type', 'Additional_Work', 'Sports_activity', 'Transportation',
+    'Attendance', 'Reading', 'Notes', 'Listening_in_Class', 'Project_work', 'Grade'
+)
+NUMERIC_COLUMNS = ('Student_Age', 'Scholarship', 'Weekly_Study_Hours')
+LOAD_CHUNK_SIZE = 50_000
+REFRESH_OVERLAP_IDS = 1000  # IDs below the high-water mark re-read in case they committed late
+INITIAL_CAPACITY = 1024
+
+
+class ColumnarSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0  # bumped on every change of the arrays, keys the memoized results
+        self.rebuilds = 0
+        self._reset()
+
+    def _reset(self):
+        self.size = 0
+        self.high_water = 0
+        self.refreshed_at = None
+        self.last_refresh_seconds = 0.0
+        self._markers = None  # (row count, max Student_ID, change counter) at the last refresh
+        self._version += 1
+        self.ids = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.hashes = np.zeros(INITIAL_CAPACITY, dtype=np.uint64)  # 0 = not fingerprinted
+        self.numeric = {name: np.empty(INITIAL_CAPACITY, dtype=np.float32) for name in NUMERIC_COLUMNS}
+        self.codes = {name: np.empty(INITIAL_CAPACITY, dtype=np.int16) for name in CATEGORICAL_COLUMNS}
+        self.categories: Dict[str, List[str]] = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._category_index: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self._unique_hashes = (0, 0)  # (version it was computed at, distinct fingerprints + unhashed rows)
+
+    # --- Loading -----------------------------------------------------------------
+
+    def _grow(self, needed: int):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+
+        def resized(array):
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            return grown
+
+        self.ids = resized(self.ids)
+        self.hashes = resized(self.hashes)
+        self.numeric = {name: resized(array) for name, array in self.numeric.items()}
+        self.codes = {name: resized(array) for name, array in self.codes.items()}
+
+    def _encode(self, name: str, values) -> np.ndarray:
+        index = self._category_index[name]
+        categories = self.categories[name]
+        codes = np.empty(len(values), dtype=np.int16)
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+                continue
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(categories)
+                categories.append(value)
+            codes[i] = code
+        return codes
+
+    def _append(self, rows):
+        count = len(rows)
+        if not count:
+            return
+        start, end = self.size, self.size + count
+        self._grow(end)
+        columns = list(zip(*rows))
+        self.ids[start:end] = columns[0]
+        self.hashes[start:end] = [int(value[:16], 16) if value else 0 for value in columns[1]]
+        for offset, name in enumerate(NUMERIC_COLUMNS, start=2):
+            self.numeric[name][start:end] = [np.nan if value is None else value for value in columns[offset]]
+        for offset, name in enumerate(CATEGORICAL_COLUMNS, start=2 + len(NUMERIC_COLUMNS)):
+            self.codes[name][start:end] = self._encode(name, columns[offset])
+        self.size = end
+        self.high_water = max(self.high_water, int(columns[0][-1]))
+        self._version += 1
+
+    def _read_above(self, db: Session, floor: int, known=frozenset()) -> int:
+        """Appends the rows with Student_ID > floor that aren't in the snapshot yet."""
+        table = StudentModel.__table__
+        selected = [table.c.Student_ID, table.c.Record_Hash]
+        selected += [table.c[name] for name in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS]
+        added = 0
+        while True:
+            rows = db.execute(
+                select(*selected)
+                .where(table.c.Student_ID > floor)
+                .order_by(table.c.Student_ID)
+                .limit(LOAD_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+            floor = rows[-1][0]
+            new_rows = [row for row in rows if row[0] not in known]
+            self._append(new_rows)
+            added += len(new_rows)
+            if len(rows) < LOAD_CHUNK_SIZE:
+                break
+        return added
+
+    def refresh(self, db: Session) -> int:
+        """Catches up with the table (see the module docstring). Returns the rows appended (all after a rebuild)."""
+        from ..crud import data_version
+
+        table = StudentModel.__table__
+        with self._lock:
+            started = time.perf_counter()
+            markers = tuple(db.execute(select(
+                func.count(), func.max(table.c.Student_ID), data_version.get_version_query("students"),
+            )).one())
+            count, max_id, changes = markers[0], markers[1] or 0, markers[2]
+            if markers == self._markers:
+                return 0
+
+            if self._markers is not None and (changes != self._markers[2] or max_id < self.high_water):
+                self._reset()
+                self.rebuilds += 1
+            if self.size:
+                floor = max(self.high_water - REFRESH_OVERLAP_IDS, 0)
+                ids = self.ids[:self.size]
+                added = self._read_above(db, floor, known=set(ids[ids > floor].tolist()))
+            else:
+                added = self._read_above(db, 0)
+
+            # Rows up to max_id must add up to the count read with it; if they
+            # don't, something was deleted or committed below the window
+            if int((self.ids[:self.size] <= max_id).sum()) != count:
+                self._reset()
+                self.rebuilds += 1
+                added = self._read_above(db, 0)
+            self._markers = markers
+            self.refreshed_at = time.time()
+            self.last_refresh_seconds = time.perf_counter() - started
+            return added
+
+    # --- Queries -----------------------------------------------------------------
+
+    def _view(self) -> Tuple[int, int, Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+        """
+        Consistent read-only slices plus the version they belong to (appends
+        never modify rows below size, rebuilds allocate new arrays).
+        """
+        with self._lock:
+            n = self.size
+            return (
+                self._version,
+                n,
+                {name: array[:n] for name, array in self.codes.items()},
+                {name: array[:n] for name, array in self.numeric.items()},
+                self.hashes[:n],
+            )
+
+    def _keys(self, column: str):
+        """(codes, labels) for a groupable column; numeric columns are factorized on the fly."""
+        _, n, codes, numeric, _ = self._view()
+        if column in codes:
+            with self._lock:
+                labels = list(self.categories[column])
+            return codes[column], labels
+        values = numeric[column]
+        present = ~np.isnan(values)
+        uniques, inverse = np.unique(values[present], return_inverse=True)
+        keys = np.full(n, -1, dtype=np.int64)
+        keys[present] = inverse
+        return keys, [int(value) if float(value).is_integer() else float(value) for value in uniques]
+
+    def value_counts(self, column: str) -> Dict[Any, int]:
+        keys, labels = self._keys(column)
+        counts = np.bincount(keys[keys >= 0], minlength=len(labels))
+        return {label: int(count) for label, count in zip(labels, counts) if count}
+
+    def crosstab(self, column: str, by: str) -> Dict[Any, Dict[Any, int]]:
+        """Counts per (column value, by value): one bincount over combined codes."""
+        row_keys, row_labels = self._keys(column)
+        col_keys, col_labels = self._keys(by)
+        valid = (row_keys >= 0) & (col_keys >= 0)
+        combined = row_keys[valid].astype(np.int64) * len(col_labels) + col_keys[valid]
+        table = np.bincount(combined, minlength=len(row_labels) * len(col_labels))
+        table = table.reshape(len(row_labels), len(col_labels))
+        return {
+            row_label: {col_label: int(count) for col_label, count in zip(col_labels, counts) if count}
+            for row_label, counts in zip(row_labels, table) if counts.any()
+        }
+
+    def group_mean(self, column: str, value: str) -> Dict[Any, Optional[float]]:
+        """Mean of a numeric column per group (np.bincount with weights)."""
+        keys, labels = self._keys(column)
+        _, _, _, numeric, _ = self._view()
+        values = numeric[value].astype(np.float64)
+        valid = (keys >= 0) & ~np.isnan(values)
+        sums = np.bincount(keys[valid], weights=values[valid], minlength=len(labels))
+        counts = np.bincount(keys[valid], minlength=len(labels))
+        return {label: round(float(s / c), 3) for label, s, c in zip(labels, sums, counts) if c}
+
+    def data_quality_metrics(self) -> Dict[str, Any]:
+        """Same result as crud_student.calculate_data_quality_metrics, computed from the arrays."""
+        version, n, codes, numeric, hashes = self._view()
+        if n == 0:
+            return {
+                "total_records": 0,
+                "completion_rate": 0,
+                "unique_student_ids": 0,
+                "duplicate_records": 0,
+                "missing_values": 0,
+                "invitee_submissions": 0,
+                "age_distribution": []
+            }
+
+        # np.unique sorts, so the count is memoized until the arrays change
+        with self._lock:
+            memo_version, unique_student_ids = self._unique_hashes
+        if memo_version != version:
+            hashed = hashes[hashes != 0]
+            unique_student_ids = int(len(np.unique(hashed))) + (n - len(hashed))
+            with self._lock:
+                if self._version == version:
+                    self._unique_hashes = (version, unique_student_ids)
+
+        # Same required fields as the SQL version
+        missing_values = int(np.isnan(numeric['Student_Age']).sum())
+        missing_values += int((codes['Sex'] < 0).sum())
+        missing_values += int(np.isnan(numeric['Scholarship']).sum())
+        missing_values += int((codes['Grade'] < 0).sum())
+        missing_values += int(np.isnan(numeric['Weekly_Study_Hours']).sum())
+        total_possible = n * 5
+        completion_rate = round((total_possible - missing_values) / total_possible * 100, 1)
+
+        age_distribution = sorted(self.value_counts('Student_Age').items(), key=lambda item: item[1], reverse=True)
+
+        return {
+            "total_records": n,
+            "completion_rate": completion_rate,
+            "unique_student_ids": unique_student_ids,
+            "duplicate_records": n - unique_student_ids,
+            "missing_values": missing_values,
+            "invitee_submissions": 0,  # the model has no is_invitee column
+            "age_distribution": age_distribution
+        }
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the arrays (allocated capacity, not just used rows)."""
+        total = self.ids.nbytes + self.hashes.nbytes
+        total += sum(array.nbytes for array in self.numeric.values())
+        total += sum(array.nbytes for array in self.codes.values())
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        used = self.size * (
+            self.ids.itemsize + self.hashes.itemsize
+            + sum(array.itemsize for array in self.numeric.values())
+            + sum(array.itemsize for array in self.codes.values())
+        )
+        return {
+            "rows": self.size,
+            "high_water": self.high_water,
+            "rebuilds": self.rebuilds,
+            "allocated_bytes": self.memory_bytes(),
+            "bytes_per_row": round(used / self.size, 1) if self.size else None,
+            "mb_per_million_rows": round(used / self.size * 1_000_000 / 2**20, 1) if self.size else None,
+            "last_refresh_ms": round(self.last_refresh_seconds * 1000, 3),
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+SNAPSHOT = ColumnarSnapshot()
+
+
+def get_snapshot(db: Session) -> ColumnarSnapshot:
+    """The process-wide snapshot, caught up with the table."""
+    SNAPSHOT.refresh(db)
+    return SNAPSHOT
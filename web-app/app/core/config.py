@@ -0,0 +1,145 @@
+import os
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Project anchor: web-app/app
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Reads a boolean switch from the environment ('1', 'true', 'yes', 'on')."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- Startup ---
+# Run Base.metadata.create_all() during the lifespan hook. Disable in deployments
+# where the schema is managed separately (e.g. `python -m app.jobs.migrate` as a
+# deploy step) so workers don't touch DDL on every boot.
+CREATE_SCHEMA_ON_STARTUP = env_flag("CREATE_SCHEMA_ON_STARTUP", True)
+
+# How the ML artifacts are loaded:
+#   "background" - start unpickling in a thread at startup, serve requests immediately
+#   "eager"      - load inside the lifespan hook before the first request is accepted
+#   "lazy"       - load on the first request that needs the model
+ML_WARMUP = os.environ.get("ML_WARMUP", "background").strip().lower()
+
+ML_ARTIFACTS_DIR = Path(os.environ.get("ML_ARTIFACTS_DIR", APP_DIR / "ml_artifacts"))
+
+# --- Invitations ---
+# Webhook that sends the data collection invite e-mail (n8n workflow)
+INVITE_WEBHOOK_URL = os.environ.get(
+    "INVITE_WEBHOOK_URL", "https://n8n.prasadsawant.com/webhook/send-data-collection-invite-email"
+)
+
+# --- Observability ---
+# Timing middleware, SQL query counters and the /metrics scrape endpoint.
+METRICS_ENABLED = env_flag("METRICS_ENABLED", True)
+
+# --- Request profiling (opt-in) ---
+# When disabled the profiling middleware isn't installed at all.
+PROFILING_ENABLED = env_flag("PROFILING_ENABLED", False)
+# Requests carrying this header with PROFILING_TOKEN as its value are profiled;
+# the same header is required to list and download traces. Profiling stays off
+# while PROFILING_TOKEN is empty.
+PROFILING_HEADER = os.environ.get("PROFILING_HEADER", "X-Profile")
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+# Fraction of all requests to profile without the header (0.0 - 1.0)
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL_SECONDS = float(os.environ.get("PROFILING_INTERVAL_SECONDS", "0.005"))
+PROFILING_DIR = Path(os.environ.get("PROFILING_DIR", Path(tempfile.gettempdir()) / "spa-profiles"))
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", "50"))
+
+# --- Response caching ---
+# ETag/304 handling and the in-process response cache for read-mostly pages.
+CACHE_ENABLED = env_flag("CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", "300"))
+# Browser max-age; 0 means "revalidate every time" (cheap 304s)
+CACHE_MAX_AGE = int(os.environ.get("CACHE_MAX_AGE", "0"))
+# How often the student table marker is re-read to notice other workers' writes
+CACHE_VERSION_TTL_SECONDS = float(os.environ.get("CACHE_VERSION_TTL_SECONDS", "1.0"))
+# Part of every ETag, so a deploy invalidates cached pages (defaults to the git commit)
+APP_VERSION = os.environ.get("APP_VERSION", "")
+
+# --- Feature drift monitoring ---
+DRIFT_ENABLED = env_flag("DRIFT_ENABLED", True)
+# Population Stability Index thresholds (common rule of thumb: <0.1 stable, >0.25 shifted)
+DRIFT_PSI_WARN = float(os.environ.get("DRIFT_PSI_WARN", "0.1"))
+DRIFT_PSI_ALERT = float(os.environ.get("DRIFT_PSI_ALERT", "0.25"))
+# Chi-square p-value below which a feature is flagged
+DRIFT_P_VALUE = float(os.environ.get("DRIFT_P_VALUE", "0.01"))
+# Live rows needed before scores are reported
+DRIFT_MIN_SAMPLES = int(os.environ.get("DRIFT_MIN_SAMPLES", "50"))
+
+# --- Shadow / canary model evaluation ---
+# A retrained pipeline copied into ML_ARTIFACTS_DIR as ml_model_pipeline_candidate.pkl
+# (optionally with ml_metrics_candidate.pkl etc.) scores /predict inputs off the
+# response path. Nothing runs unless the candidate pipeline exists.
+SHADOW_ENABLED = env_flag("SHADOW_ENABLED", True)
+# Pending comparisons; inputs beyond this are dropped (and counted) rather than queued
+SHADOW_QUEUE_SIZE = int(os.environ.get("SHADOW_QUEUE_SIZE", "1000"))
+# Percentage of /predict requests answered by the candidate (0 - 100)
+SHADOW_CANARY_PERCENT = float(os.environ.get("SHADOW_CANARY_PERCENT", "0"))
+# Required (as X-Admin-Token) to reload, canary or promote the candidate; while
+# empty those endpoints refuse every request
+MODEL_ADMIN_TOKEN = os.environ.get("MODEL_ADMIN_TOKEN", "")
+
+# --- Columnar analytics snapshot ---
+# Keep NumPy arrays of the student table in memory and answer the dashboard
+# metrics / group-by analytics from them instead of SQL. Costs roughly
+# 50 MB per million records per worker process.
+COLUMNAR_CACHE_ENABLED = env_flag("COLUMNAR_CACHE_ENABLED", False)
+
+# --- Invitation log retention ---
+# Log rows older than this many days are moved to email_invitation_logs_archive
+# (once at startup, or via `python -m app.jobs.archive_email_logs`). 0 keeps everything.
+EMAIL_LOG_RETENTION_DAYS = int(os.environ.get("EMAIL_LOG_RETENTION_DAYS", "0"))
+
+# --- Bulk ingest API ---
+# Max. records accepted by one POST /api/v1/student-data/bulk request
+BULK_MAX_RECORDS = int(os.environ.get("BULK_MAX_RECORDS", "100000"))
+
+# --- Group commit ---
+# Queue single-record form submissions and insert them in short shared
+# transactions (one writer connection, one commit per group). Each request
+# still waits until its own row is committed.
+GROUP_COMMIT_ENABLED = env_flag("GROUP_COMMIT_ENABLED", False)
+# A group is committed when it has this many records ...
+GROUP_COMMIT_MAX_SIZE = int(os.environ.get("GROUP_COMMIT_MAX_SIZE", "100"))
+# ... or this long after its first record arrived. With 0 a group is whatever queued
+# up while the previous commit ran, so a lone submission is never delayed.
+GROUP_COMMIT_MAX_WAIT_MS = float(os.environ.get("GROUP_COMMIT_MAX_WAIT_MS", "0"))
+# A submission still queued after this long is withdrawn and answered with 503 (0 = wait indefinitely)
+GROUP_COMMIT_TIMEOUT_SECONDS = float(os.environ.get("GROUP_COMMIT_TIMEOUT_SECONDS", "30"))
+
+# --- Early-exit inference ---
+# Evaluate the forest's trees one at a time for single /predict calls and stop
+# once the leading grade can't be overtaken (same answer as the full forest).
+# The confidence then comes from the trees evaluated and is flagged "approximate".
+EARLY_EXIT_ENABLED = env_flag("EARLY_EXIT_ENABLED", False)
+# Also stop when the confidence estimate's standard error is below this (0 = off).
+# May occasionally change the predicted grade.
+EARLY_EXIT_TOLERANCE = float(os.environ.get("EARLY_EXIT_TOLERANCE", "0"))
+EARLY_EXIT_MIN_TREES = int(os.environ.get("EARLY_EXIT_MIN_TREES", "10"))
+
+# --- Templates ---
+# Compiled Jinja templates are cached here (shared by all workers), so startup
+# and first renders skip the compile step. Empty disables the cache.
+JINJA_BYTECODE_CACHE_DIR = os.environ.get(
+    "JINJA_BYTECODE_CACHE_DIR", str(Path(tempfile.gettempdir()) / "spa-jinja-cache")
+)
+# Compile the pages/ templates in the lifespan hook instead of on first render
+TEMPLATE_PRECOMPILE = env_flag("TEMPLATE_PRECOMPILE", True)
+
+# --- Static assets ---
+# The deploy runs `python -m app.jobs.build_static --download` to vendor the
+# third-party CSS/JS into static/vendor/. While an asset is missing there, pages
+# link its pinned CDN URL and startup logs a warning; with this off, startup
+# fails instead.
+VENDOR_CDN_FALLBACK = env_flag("VENDOR_CDN_FALLBACK", True)
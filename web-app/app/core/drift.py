@@ -0,0 +1,112 @@
+"""
+Feature drift between live student records and the model's training data.
+
+The reference proportions are saved by train_model.py (ml_feature_reference.pkl)
+and the live value counts are maintained incrementally in feature_histograms by
+the CRUD write paths (right after each insert commits), so a drift report is one small SELECT plus arithmetic over
+a few dozen buckets.
+"""
+import math
+from typing import Any, Dict, Optional
+
+from . import config
+
+# The 13 model inputs (Grade is the target and isn't monitored)
+FEATURES = (
+    'Student_Age', 'Sex', 'High_School_Type', 'Scholarship', 'Additional_Work',
+    'Sports_activity', 'Transportation', 'Weekly_Study_Hours', 'Attendance',
+    'Reading', 'Notes', 'Listening_in_Class', 'Project_work'
+)
+
+# Smoothing for buckets that are empty on one side (PSI would be infinite)
+EPSILON = 1e-4
+
+
+def feature_value_key(value) -> str:
+    """Histogram bucket for a value (must match train_model.py)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def population_stability_index(reference: Dict[str, float], live: Dict[str, int]) -> float:
+    total = sum(live.values())
+    psi = 0.0
+    for bucket in set(reference) | set(live):
+        expected = max(reference.get(bucket, 0.0), EPSILON)
+        actual = max(live.get(bucket, 0) / total, EPSILON)
+        psi += (actual - expected) * math.log(actual / expected)
+    return psi
+
+
+def chi_square(reference: Dict[str, float], live: Dict[str, int]):
+    """Goodness-of-fit of the live counts against the reference proportions."""
+    total = sum(live.values())
+    buckets = set(reference) | set(live)
+    statistic = 0.0
+    for bucket in buckets:
+        expected = max(reference.get(bucket, 0.0), EPSILON) * total
+        statistic += (live.get(bucket, 0) - expected) ** 2 / expected
+    dof = max(len(buckets) - 1, 1)
+    try:
+        from scipy.stats import chi2
+        p_value = float(chi2.sf(statistic, dof))
+    except ImportError:
+        p_value = None
+    return statistic, dof, p_value
+
+
+def _status(psi: float, p_value: Optional[float]) -> str:
+    if psi >= config.DRIFT_PSI_ALERT:
+        return "ALERT"
+    if psi >= config.DRIFT_PSI_WARN or (p_value is not None and p_value < config.DRIFT_P_VALUE):
+        return "WARN"
+    return "OK"
+
+
+def drift_report(reference: Optional[dict], live: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Per-feature PSI / chi-square scores and an overall status."""
+    live_rows = max((sum(counts.values()) for counts in live.values()), default=0)
+    report = {
+        "available": reference is not None,
+        "live_rows": live_rows,
+        "reference_rows": reference.get("n_rows") if reference else 0,
+        "thresholds": {
+            "psi_warn": config.DRIFT_PSI_WARN,
+            "psi_alert": config.DRIFT_PSI_ALERT,
+            "p_value": config.DRIFT_P_VALUE,
+            "min_samples": config.DRIFT_MIN_SAMPLES,
+        },
+        "features": [],
+        "status": "UNAVAILABLE",
+        "max_psi": None,
+    }
+    if reference is None:
+        return report
+    if live_rows < config.DRIFT_MIN_SAMPLES:
+        report["status"] = "INSUFFICIENT_DATA"
+        return report
+
+    for feature in FEATURES:
+        reference_props = reference["features"].get(feature)
+        counts = live.get(feature, {})
+        if not reference_props or not counts:
+            continue
+        psi = population_stability_index(reference_props, counts)
+        statistic, dof, p_value = chi_square(reference_props, counts)
+        report["features"].append({
+            "feature": feature,
+            "psi": round(psi, 4),
+            "chi2": round(statistic, 3),
+            "dof": dof,
+            "p_value": p_value,
+            "status": _status(psi, p_value),
+        })
+
+    report["features"].sort(key=lambda item: item["psi"], reverse=True)
+    statuses = {item["status"] for item in report["features"]}
+    report["status"] = "ALERT" if "ALERT" in statuses else "WARN" if "WARN" in statuses else "OK"
+    report["max_psi"] = report["features"][0]["psi"] if report["features"] else None
+    return report
@@ -0,0 +1,133 @@
+"""
+Early-exit inference for the random forest behind /predict.
+
+A RandomForestClassifier averages the class probabilities of all its trees.
+For a single input the vote is often settled long before the last tree: once
+the leading class is ahead by more than the number of trees still to go, no
+remaining tree can change the answer (each adds at most 1 to any class).
+EarlyExitForest evaluates the trees one at a time and stops there, so the
+predicted grade is the same as the full forest's. The reported confidence is
+the leader's mean probability over the trees that were evaluated. Unless every
+tree ran, that is only an estimate of the full forest's predict_proba (it can
+be higher or lower), and /predict returns "approximate": true with it.
+
+With EARLY_EXIT_TOLERANCE > 0 it may also stop (after EARLY_EXIT_MIN_TREES)
+when the standard error of that confidence estimate, with the finite-population
+correction for the trees left, drops below the tolerance. That exit can in
+rare cases return a different grade than the full forest.
+
+The tree order is fixed at load time: trees that agree most often with the
+whole forest on inputs sampled from the training distributions
+(ml_feature_reference.pkl) go first, which makes early consensus more likely.
+Without a reference the trained order is kept.
+"""
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+ORDERING_SAMPLES = 2000
+
+
+class EarlyExitForest:
+    def __init__(self, pipeline, reference: Optional[dict] = None):
+        self.preprocessor = pipeline[:-1]
+        forest = pipeline[-1]
+        self.classes = forest.classes_
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        # Per-tree leaf class distributions, normalized once so a tree's vote is a lookup
+        self.leaf_probabilities = []
+        for tree in trees:
+            values = tree.value[:, 0, :].astype(np.float64)
+            totals = values.sum(axis=1, keepdims=True)
+            self.leaf_probabilities.append(values / np.where(totals == 0, 1, totals))
+        self.trees = trees
+        self.order = self._choose_order(pipeline, reference)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, reference: Optional[dict] = None) -> Optional["EarlyExitForest"]:
+        """Returns None for pipelines that don't end in a fitted tree ensemble."""
+        forest = pipeline[-1] if hasattr(pipeline, "steps") else None
+        if forest is None or not hasattr(forest, "estimators_") or not hasattr(forest, "classes_"):
+            return None
+        try:
+            return cls(pipeline, reference)
+        except Exception:
+            logger.exception("Early-exit inference unavailable for this model")
+            return None
+
+    def _choose_order(self, pipeline, reference: Optional[dict]) -> np.ndarray:
+        n_trees = len(self.trees)
+        if not reference or not reference.get("features"):
+            return np.arange(n_trees)
+
+        import pandas as pd
+
+        rng = np.random.default_rng(0)
+        columns = {}
+        for feature, proportions in reference["features"].items():
+            values = [key for key in proportions if key != '']
+            weights = np.array([proportions[key] for key in values], dtype=np.float64)
+            # Reference keys are strings; numeric features go back to numbers
+            try:
+                values = [float(value) for value in values]
+            except ValueError:
+                pass
+            columns[feature] = rng.choice(np.array(values, dtype=object), size=ORDERING_SAMPLES, p=weights / weights.sum())
+        sample = pd.DataFrame(columns)
+
+        features = self._transform(sample)
+        votes = np.stack([self._tree_probabilities(index, features) for index in range(n_trees)])
+        forest_labels = votes.mean(axis=0).argmax(axis=1)
+        agreement = (votes.argmax(axis=2) == forest_labels).mean(axis=1)
+        # Most forest-like trees first (stable for ties)
+        return np.argsort(-agreement, kind="stable")
+
+    def _transform(self, input_data) -> np.ndarray:
+        return np.asarray(self.preprocessor.transform(input_data), dtype=np.float32)
+
+    def _tree_probabilities(self, index: int, features: np.ndarray) -> np.ndarray:
+        return self.leaf_probabilities[index][self.trees[index].apply(features)]
+
+    def predict_one(self, input_data, tolerance: Optional[float] = None,
+                    min_trees: Optional[int] = None) -> Tuple[object, float, int]:
+        """
+        (predicted class, confidence, trees evaluated) for a single-row frame.
+        The confidence is exact only when trees evaluated == n_trees.
+        """
+        tolerance = config.EARLY_EXIT_TOLERANCE if tolerance is None else tolerance
+        min_trees = config.EARLY_EXIT_MIN_TREES if min_trees is None else min_trees
+        features = self._transform(input_data)[:1]
+        n_trees = len(self.order)
+
+        votes = np.empty((n_trees, len(self.classes)))
+        totals = np.zeros(len(self.classes))
+        evaluated = 0
+        for index in self.order:
+            votes[evaluated] = self._tree_probabilities(index, features)[0]
+            totals += votes[evaluated]
+            evaluated += 1
+            remaining = n_trees - evaluated
+            if remaining == 0:
+                break
+
+            # Each remaining tree adds at most 1 to any class
+            first, second = np.partition(totals, -2)[-1:-3:-1]
+            if first - second > remaining:
+                break
+            if tolerance > 0 and evaluated >= min_trees:
+                leader_votes = votes[:evaluated, int(totals.argmax())]
+                standard_error = np.sqrt(leader_votes.var() / evaluated * remaining / (n_trees - 1))
+                if standard_error < tolerance:
+                    break
+
+        leader = int(totals.argmax())
+        return self.classes[leader], float(totals[leader] / evaluated), evaluated
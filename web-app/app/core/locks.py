@@ -0,0 +1,60 @@
+"""
+Cross-process locks for one-off work that every worker would otherwise repeat
+at startup (schema upgrades, histogram rebuilds, log archival).
+
+On PostgreSQL this is a session-level advisory lock keyed by the lock name, so
+it also covers workers on other hosts. Other backends (SQLite) use an flock'ed
+file in the temp directory, keyed by database URL and name, which covers the
+workers of one host - the only way SQLite is deployed.
+"""
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import text
+
+
+def _key(name: str) -> int:
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(engine, name: str, blocking: bool = True):
+    """
+    Holds the named lock for the duration of the block and yields True. With
+    blocking=False it yields False right away if another process holds it.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            if blocking:
+                conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _key(name)})
+                acquired = True
+            else:
+                acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _key(name)}).scalar()
+            # The lock is session-level; don't sit idle in a transaction while holding it
+            conn.commit()
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _key(name)})
+                    conn.commit()
+        return
+
+    try:
+        import fcntl
+    except ImportError:  # Windows: single-process development only
+        yield True
+        return
+    digest = hashlib.sha256(f"{engine.url}|{name}".encode()).hexdigest()[:16]
+    with open(Path(tempfile.gettempdir()) / f"spa-lock-{digest}.lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,257 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+No external dependency: counters and histograms are plain dicts guarded by a
+lock, keyed by label values. Per-request state (DB query count/time) travels in
+a ContextVar so it follows the request into the threadpool used by sync
+endpoints and dependencies.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, amount: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += amount
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._values.get(key)
+        return sum(series[:-1]) if series else 0
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+REGISTRY: List = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Renders every registered metric in the Prometheus text format (0.0.4)."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metric definitions ---
+HTTP_REQUESTS = register(Counter(
+    "http_requests_total", "HTTP requests served.", ("method", "route", "status")))
+HTTP_LATENCY = register(Histogram(
+    "http_request_duration_seconds", "End-to-end request latency.", ("method", "route")))
+HTTP_QUEUE_WAIT = register(Histogram(
+    "http_request_queue_seconds", "Time between the proxy's X-Request-Start header and the app.", ("route",)))
+DB_QUERIES = register(Histogram(
+    "http_request_db_queries", "SQL statements issued per request.", ("route",), COUNT_BUCKETS))
+DB_TIME = register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("route",)))
+DB_QUERY_LATENCY = register(Histogram(
+    "db_query_duration_seconds", "Latency of individual SQL statements.", (), FAST_BUCKETS))
+ML_INFERENCE = register(Histogram(
+    "ml_inference_duration_seconds", "Time spent in ML pipeline calls.", ("operation",), FAST_BUCKETS))
+ML_TREES_EVALUATED = register(Histogram(
+    "ml_early_exit_trees_evaluated", "Trees evaluated per early-exit prediction.", (),
+    (5, 10, 15, 20, 30, 40, 50, 60, 80, 100)))
+IMPORT_ROWS = register(Counter(
+    "csv_import_rows_total", "Rows processed by the CSV import.", ("result",)))
+IMPORT_DURATION = register(Histogram(
+    "csv_import_duration_seconds", "Duration of CSV import requests.", ()))
+
+
+# --- Per-request state ---
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def _route_label(scope, initial_root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps (e.g. /static) don't set "route"; label them by mount point
+    root_path = scope.get("root_path", "")
+    if root_path != initial_root_path:
+        return root_path[len(initial_root_path):]
+    return "<unmatched>"
+
+
+def _queue_wait(scope) -> Optional[float]:
+    """Parses nginx-style 'X-Request-Start: t=<epoch seconds>' if present."""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-request-start":
+            raw = value.decode("latin-1").strip()
+            if raw.startswith("t="):
+                raw = raw[2:]
+            try:
+                started = float(raw)
+            except ValueError:
+                return None
+            if started > 1e12:  # milliseconds
+                started /= 1000.0
+            return max(time.time() - started, 0.0)
+    return None
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request (no body buffering)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_holder = [500]
+        queue_wait = _queue_wait(scope)
+        initial_root_path = scope.get("root_path", "")
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = _route_label(scope, initial_root_path)
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=status_holder[0])
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            DB_QUERIES.observe(stats.db_queries, route=route)
+            DB_TIME.observe(stats.db_seconds, route=route)
+            if queue_wait is not None:
+                HTTP_QUEUE_WAIT.observe(queue_wait, route=route)
+
+
+# --- SQLAlchemy hooks ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for failed statements
+    starts = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    """Attaches the query counters to an Engine (idempotent)."""
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
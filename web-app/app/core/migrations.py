@@ -0,0 +1,66 @@
+"""
+Additive schema upgrades run at startup (when CREATE_SCHEMA_ON_STARTUP is on).
+
+create_all() only creates missing tables. This module also adds columns and
+indexes that were introduced after a table was first created, so existing
+deployments pick them up without a manual ALTER. Only nullable columns are
+added automatically; anything else needs a real migration.
+
+Workers starting together would otherwise race through the same checks and
+ALTERs, so ensure_schema() runs under the "schema" lock (core.locks).
+Deployments can also turn CREATE_SCHEMA_ON_STARTUP off and run
+`python -m app.jobs.migrate` once.
+"""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+from .database import Base
+from .locks import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns_and_indexes(engine):
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+
+        with engine.begin() as conn:
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable:
+                    logger.warning("Cannot add NOT NULL column %s.%s automatically", table.name, column.name)
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                preparer = engine.dialect.identifier_preparer
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                )
+                logger.info("Added column %s.%s", table.name, column.name)
+
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    conn.execute(CreateIndex(index))
+                    logger.info("Created index %s", index.name)
+
+
+def ensure_schema(engine):
+    """Creates missing tables, then missing nullable columns and indexes (one process at a time)."""
+    from ..core.database import SessionLocal
+    from ..crud import crud_student
+
+    with advisory_lock(engine, "schema"):
+        Base.metadata.create_all(bind=engine)
+        _add_missing_columns_and_indexes(engine)
+
+        # Fingerprint rows written before Record_Hash existed
+        with SessionLocal() as db:
+            backfilled = crud_student.backfill_record_hashes(db)
+    if backfilled:
+        logger.info("Backfilled Record_Hash for %s student records", backfilled)
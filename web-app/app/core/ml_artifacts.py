@@ -0,0 +1,102 @@
+"""
+Holds the trained ML artifacts (pipeline, metrics, feature importance).
+
+Nothing is unpickled at import time: joblib/pandas/scikit-learn are only imported
+when load_artifacts() first runs, either from the lifespan warm-up or from the
+first request that needs the model.
+"""
+import hashlib
+import threading
+from . import config
+
+ARTIFACTS_DIR = config.ML_ARTIFACTS_DIR
+
+ML_PIPELINE = None
+DEFAULT_METRICS = {'accuracy': 0.0, 'report': 'N/A', 'feature_names': []}
+ML_METRICS = dict(DEFAULT_METRICS)
+ML_IMPORTANCE = None  # pandas DataFrame (top 5 features) once loaded
+ML_FEATURE_REFERENCE = None  # per-feature training distributions for drift monitoring
+ML_EARLY_EXIT = None  # early_exit.EarlyExitForest over ML_PIPELINE (when EARLY_EXIT_ENABLED)
+MODEL_VERSION = "none"  # short SHA-256 of the pipeline pickle, used for cache validators
+
+_load_lock = threading.Lock()
+_loaded = False
+
+
+def is_loaded() -> bool:
+    return _loaded
+
+
+def file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def load_artifacts():
+    """Loads the artifacts once. Safe to call from several threads."""
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        _load()
+
+
+def reload_artifacts():
+    """Re-reads the artifacts from disk (e.g. after a model promotion)."""
+    with _load_lock:
+        _load()
+
+
+def _load():
+    global ML_PIPELINE, ML_METRICS, ML_IMPORTANCE, ML_FEATURE_REFERENCE, ML_EARLY_EXIT, MODEL_VERSION, _loaded
+
+    import joblib
+    import pandas as pd
+
+    pipeline_path = ARTIFACTS_DIR / 'ml_model_pipeline.pkl'
+    metrics_path = ARTIFACTS_DIR / 'ml_metrics.pkl'
+    importance_path = ARTIFACTS_DIR / 'ml_feature_importance.pkl'
+
+    try:
+        pipeline = joblib.load(pipeline_path)
+        # A fresh dict, so keys of a previous model's metrics don't survive a reload
+        metrics = {**DEFAULT_METRICS, **joblib.load(metrics_path)}
+        importance = joblib.load(importance_path)
+
+        # Ensure importance is sorted for UI display
+        if not importance.empty:
+            importance = importance.sort_values(by='importance', ascending=False).head(5)
+
+        ML_PIPELINE = pipeline
+        ML_METRICS = metrics
+        ML_IMPORTANCE = importance
+        MODEL_VERSION = file_digest(pipeline_path)
+    except FileNotFoundError:
+        print(f"WARNING: ML model files not found in {ARTIFACTS_DIR}. Please run train_model.py first.")
+        # Keep the default empty/safe values
+        ML_IMPORTANCE = pd.DataFrame()
+
+    # Optional: older training runs didn't save reference distributions
+    reference_path = ARTIFACTS_DIR / 'ml_feature_reference.pkl'
+    try:
+        ML_FEATURE_REFERENCE = joblib.load(reference_path)
+    except FileNotFoundError:
+        ML_FEATURE_REFERENCE = None
+
+    # Tree order for early-exit inference is chosen once per loaded model
+    if config.EARLY_EXIT_ENABLED and ML_PIPELINE is not None:
+        from .early_exit import EarlyExitForest
+        ML_EARLY_EXIT = EarlyExitForest.from_pipeline(ML_PIPELINE, ML_FEATURE_REFERENCE)
+
+    _loaded = True
+
+
+def start_background_warmup() -> threading.Thread:
+    """Starts loading the artifacts in a daemon thread and returns immediately."""
+    thread = threading.Thread(target=load_artifacts, name="ml-artifacts-warmup", daemon=True)
+    thread.start()
+    return thread
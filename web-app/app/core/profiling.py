@@ -0,0 +1,270 @@
+"""
+Opt-in per-request profiling.
+
+A profiled request gets a stack sampler (sys._current_frames() every few ms)
+and a record of every SQL statement issued while it runs. Only the request's own
+work is sampled: the event loop thread while the request's task is the one
+running, and a threadpool worker while it runs a call for the request (sync
+endpoints and dependencies, run_in_threadpool, file responses, all of which go
+through anyio.to_thread.run_sync; instrument_threadpool() wraps it). The samples are
+written as folded stacks ("frame;frame;frame count"), which flamegraph.pl,
+speedscope and inferno read directly, next to a JSON summary with the SQL log.
+
+Nothing here runs unless PROFILING_ENABLED and PROFILING_TOKEN are set: main.py
+only installs the middleware, the threadpool wrapper and the SQL hooks in that case.
+"""
+import asyncio
+import functools
+import json
+import logging
+import random
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Frames that mean "this thread is idle" (event loop polling, pool workers waiting)
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "wait", "_worker", "get", "accept", "sleep"}
+
+
+class ProfileSession:
+    def __init__(self, method: str, path: str):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.samples: Counter = Counter()
+        self.sql = []
+        self.started = time.time()
+        self.duration = 0.0
+        self.status = None
+        # The request's task on the event loop, and worker threads that ran its code
+        self.loop = None
+        self.task = None
+        self.loop_thread = None
+        self.threads = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name=f"profiler-{self.id}", daemon=True)
+
+    def run_tracked(self, func, *args):
+        """Runs func(*args) in the calling worker thread, sampling the thread meanwhile."""
+        thread_id = threading.get_ident()
+        self.threads.add(thread_id)
+        try:
+            return func(*args)
+        finally:
+            self.threads.discard(thread_id)
+
+    def _sampled_threads(self) -> set:
+        threads = set(self.threads)
+        # The loop thread is shared by all requests: only count it while our task runs
+        if self.loop is not None and asyncio.current_task(self.loop) is self.task:
+            threads.add(self.loop_thread)
+        return threads
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        interval = config.PROFILING_INTERVAL_SECONDS
+        while not self._stop.wait(interval):
+            wanted = self._sampled_threads()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in wanted or frame.f_code.co_name in IDLE_FUNCTIONS:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.loop_thread = threading.get_ident()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started": self.started,
+            "duration_seconds": self.duration,
+            "sample_interval_seconds": config.PROFILING_INTERVAL_SECONDS,
+            "samples": sum(self.samples.values()),
+            "sql_statements": len(self.sql),
+            "sql_seconds": sum(entry["seconds"] for entry in self.sql),
+            "sql": self.sql,
+        }
+
+    def save(self):
+        directory = config.PROFILING_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{self.id}.folded").write_text(self.folded())
+        (directory / f"{self.id}.json").write_text(json.dumps(self.summary(), indent=2))
+        _enforce_retention()
+
+
+current_session: ContextVar[Optional[ProfileSession]] = ContextVar("current_profile_session", default=None)
+
+
+def _enforce_retention():
+    summaries = sorted(config.PROFILING_DIR.glob("*.json"))
+    for old in summaries[:-config.PROFILING_MAX_FILES]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def list_profiles():
+    if not config.PROFILING_DIR.exists():
+        return []
+    profiles = []
+    for path in sorted(config.PROFILING_DIR.glob("*.json"), reverse=True):
+        summary = json.loads(path.read_text())
+        summary.pop("sql", None)
+        profiles.append(summary)
+    return profiles
+
+
+def profile_path(profile_id: str, suffix: str):
+    """Returns the file for a profile id, or None (ids are validated, no traversal)."""
+    if not profile_id.replace("-", "").isalnum():
+        return None
+    path = config.PROFILING_DIR / f"{profile_id}{suffix}"
+    return path if path.exists() else None
+
+
+def is_configured() -> bool:
+    """PROFILING_ENABLED, and a token to guard it with."""
+    if config.PROFILING_ENABLED and not config.PROFILING_TOKEN:
+        logger.error("PROFILING_ENABLED is set but PROFILING_TOKEN is empty; profiling stays off")
+        return False
+    return config.PROFILING_ENABLED
+
+
+def token_ok(value: Optional[str]) -> bool:
+    """Without a configured PROFILING_TOKEN nothing is authorized."""
+    return bool(config.PROFILING_TOKEN) and value is not None and secrets.compare_digest(
+        value.encode("latin-1", "replace"), config.PROFILING_TOKEN.encode("latin-1", "replace"))
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry the profiling header or fall in the sample."""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = config.PROFILING_HEADER.lower().encode("latin-1")
+
+    def _wanted(self, scope) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                return token_ok(value.decode("latin-1"))
+        rate = config.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope["method"], scope["path"])
+        token = current_session.set(session)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", session.id.encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        session.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session.duration = time.perf_counter() - start
+            current_session.reset(token)
+            # Joining the sampler and writing the files would block the event loop
+            await run_in_threadpool(session.stop)
+            await run_in_threadpool(session.save)
+
+
+# --- Threadpool hook ---
+_original_run_sync = None
+
+
+async def _run_sync(func, *args, **kwargs):
+    session = current_session.get()
+    if session is not None:
+        func = functools.partial(session.run_tracked, func)
+    return await _original_run_sync(func, *args, **kwargs)
+
+
+def instrument_threadpool():
+    """
+    Wraps anyio.to_thread.run_sync (which Starlette and FastAPI look up on
+    every call) so profiled requests sample the worker threads running their
+    calls, whether or not those issue SQL (idempotent).
+    """
+    global _original_run_sync
+    import anyio.to_thread
+
+    if _original_run_sync is None:
+        _original_run_sync = anyio.to_thread.run_sync
+        anyio.to_thread.run_sync = _run_sync
+
+
+# --- SQLAlchemy hooks ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = current_session.get()
+    if session is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = current_session.get()
+    if session is None:
+        return
+    starts = conn.info.get("profile_query_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    session.sql.append({
+        "statement": statement,
+        "executemany": executemany,
+        "seconds": elapsed,
+    })
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("profile_query_start") if exception_context.connection else None
+    if starts and current_session.get() is not None:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    """Records SQL statements of profiled requests (idempotent)."""
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,362 @@
+"""
+Shadow / canary evaluation of a retrained model on live /predict traffic.
+
+A candidate pipeline (ml_model_pipeline_candidate.pkl in ML_ARTIFACTS_DIR) is
+scored on the same inputs as the live model by a single background worker, so
+the comparison never adds latency to the response. Jobs go through a bounded
+queue; when it is full the comparison is dropped and counted instead of
+blocking the request.
+
+SHADOW_CANARY_PERCENT of the requests are answered by the candidate instead;
+the live model is then the one scored in the background. Either way both
+models see every sampled input, so agreement is measured on all of them.
+
+promote() swaps the candidate files over the live ones (keeping *_previous.pkl
+copies) and reloads the artifacts in this process, without a restart.
+
+The canary percentage and a model generation (bumped by candidate reloads and
+promotions) are shared by all workers through model_state.json next to the
+artifacts. Every worker checks its mtime at most every STATE_CHECK_SECONDS
+(sync(), called before predictions) and applies a new canary split or reloads
+the live and candidate models when the generation moved. Comparison stats stay
+per worker.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+from . import config, metrics
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILES = (
+    'ml_model_pipeline.pkl', 'ml_metrics.pkl', 'ml_feature_importance.pkl', 'ml_feature_reference.pkl'
+)
+CANDIDATE_SUFFIX = '_candidate'
+PREVIOUS_SUFFIX = '_previous'
+LATENCY_WINDOW = 1000  # recent latencies kept per model for the percentiles in report()
+STATE_FILE = 'model_state.json'
+STATE_CHECK_SECONDS = 1.0
+
+SHADOW_COMPARISONS = metrics.register(metrics.Counter(
+    "shadow_comparisons_total", "Live vs. candidate predictions compared", ["result"]))
+SHADOW_LATENCY = metrics.register(metrics.Histogram(
+    "shadow_predict_seconds", "predict() latency of the live and candidate models", ["model"],
+    buckets=metrics.FAST_BUCKETS))
+SHADOW_DROPPED = metrics.register(metrics.Counter(
+    "shadow_dropped_total", "Comparisons skipped because the shadow queue was full"))
+
+CANDIDATE_PIPELINE = None
+CANDIDATE_VERSION = None
+CANARY_PERCENT = config.SHADOW_CANARY_PERCENT
+
+_lock = threading.Lock()
+_queue: "queue.Queue" = queue.Queue(maxsize=config.SHADOW_QUEUE_SIZE)
+_worker: Optional[threading.Thread] = None
+# What this worker last applied from STATE_FILE
+_state_lock = threading.Lock()
+_state_seen = {"mtime_ns": None, "generation": 0, "checked": 0.0}
+
+
+def _candidate_path(name: str):
+    stem, ext = os.path.splitext(name)
+    return config.ML_ARTIFACTS_DIR / f"{stem}{CANDIDATE_SUFFIX}{ext}"
+
+
+class ShadowStats:
+    """Agreement counts and recent latencies since the candidate was loaded."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.compared = 0
+        self.agreed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.canaried = 0
+        # live label -> Counter of candidate labels
+        self.confusion: Dict[str, Counter] = {}
+        self.latency = {"live": deque(maxlen=LATENCY_WINDOW), "candidate": deque(maxlen=LATENCY_WINDOW)}
+
+    def record(self, live_label, candidate_label, live_seconds: float, candidate_seconds: float):
+        agreed = live_label == candidate_label
+        with self.lock:
+            self.compared += 1
+            self.agreed += agreed
+            self.confusion.setdefault(str(live_label), Counter())[str(candidate_label)] += 1
+            self.latency["live"].append(live_seconds)
+            self.latency["candidate"].append(candidate_seconds)
+        SHADOW_COMPARISONS.inc(result="agree" if agreed else "disagree")
+        SHADOW_LATENCY.observe(live_seconds, model="live")
+        SHADOW_LATENCY.observe(candidate_seconds, model="candidate")
+
+    def report(self) -> Dict[str, Any]:
+        with self.lock:
+            per_class = {}
+            for label, counts in sorted(self.confusion.items()):
+                total = sum(counts.values())
+                disagreed = total - counts.get(label, 0)
+                per_class[label] = {
+                    "total": total,
+                    "disagreed": disagreed,
+                    "disagreement_rate": round(disagreed / total, 4) if total else None,
+                    "candidate_predictions": dict(counts),
+                }
+            return {
+                "compared": self.compared,
+                "agreement_rate": round(self.agreed / self.compared, 4) if self.compared else None,
+                "errors": self.errors,
+                "dropped": self.dropped,
+                "canaried": self.canaried,
+                "per_class": per_class,
+                "latency_ms": {model: _percentiles(values) for model, values in self.latency.items()},
+            }
+
+
+def _percentiles(values) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": None, "p95": None, "p99": None}
+
+    def pick(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+STATS = ShadowStats()
+
+
+def is_active() -> bool:
+    return config.SHADOW_ENABLED and CANDIDATE_PIPELINE is not None
+
+
+def load_candidate() -> bool:
+    """
+    (Re)loads the candidate pipeline from disk and resets the stats in this
+    worker. Returns True if found. publish_candidate() makes the others follow.
+    """
+    global CANDIDATE_PIPELINE, CANDIDATE_VERSION, STATS
+
+    if not config.SHADOW_ENABLED:
+        return False
+    from .ml_artifacts import file_digest
+
+    path = _candidate_path('ml_model_pipeline.pkl')
+    if not path.exists():
+        with _lock:
+            CANDIDATE_PIPELINE, CANDIDATE_VERSION = None, None
+        return False
+
+    import joblib
+    pipeline = joblib.load(path)
+    with _lock:
+        CANDIDATE_PIPELINE = pipeline
+        CANDIDATE_VERSION = file_digest(path)
+        STATS = ShadowStats()
+    _ensure_worker()
+    logger.info("Shadow candidate %s loaded", CANDIDATE_VERSION)
+    return True
+
+
+def _state_path():
+    return config.ML_ARTIFACTS_DIR / STATE_FILE
+
+
+def _read_state() -> Dict[str, Any]:
+    try:
+        return json.loads(_state_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _state_mtime() -> Optional[int]:
+    try:
+        return _state_path().stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _publish(bump_generation: bool = False, **changes):
+    """Updates the shared state file (atomically, one writer at a time)."""
+    from .database import engine
+    from .locks import advisory_lock
+
+    with advisory_lock(engine, "model-state"):
+        state = _read_state()
+        state.update(changes)
+        if bump_generation:
+            state["generation"] = state.get("generation", 0) + 1
+        temporary = _state_path().with_suffix(".tmp")
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, _state_path())
+        with _state_lock:
+            _state_seen.update(mtime_ns=_state_mtime(), generation=state.get("generation", 0))
+
+
+def state_changed() -> bool:
+    """Cheap check (one stat() per STATE_CHECK_SECONDS) whether sync() has work to do."""
+    now = time.monotonic()
+    if now - _state_seen["checked"] < STATE_CHECK_SECONDS:
+        return False
+    _state_seen["checked"] = now
+    return _state_mtime() != _state_seen["mtime_ns"]
+
+
+def sync(reload: bool = True):
+    """
+    Applies the shared canary split and reloads the models if another worker
+    published a new generation. Startup calls it with reload=False, before
+    anything is loaded, to record the generation the files on disk are at.
+    """
+    global CANARY_PERCENT
+    from . import cache, ml_artifacts
+
+    with _state_lock:
+        mtime_ns = _state_mtime()
+        if mtime_ns == _state_seen["mtime_ns"]:
+            return
+        state = _read_state()
+        generation = state.get("generation", 0)
+        reload = reload and generation != _state_seen["generation"]
+        _state_seen.update(mtime_ns=mtime_ns, generation=generation)
+        if "canary_percent" in state:
+            CANARY_PERCENT = min(max(float(state["canary_percent"]), 0.0), 100.0)
+    if reload:
+        logger.info("Model generation %s published by another worker, reloading", generation)
+        ml_artifacts.reload_artifacts()
+        load_candidate()
+        cache.invalidate("model")
+
+
+def set_canary_percent(percent: float, publish: bool = True):
+    """Sets the canary split for this worker and (by default) for all of them."""
+    global CANARY_PERCENT
+    CANARY_PERCENT = min(max(float(percent), 0.0), 100.0)
+    if publish:
+        _publish(canary_percent=CANARY_PERCENT)
+
+
+def publish_candidate() -> bool:
+    """load_candidate() here, then in every other worker (via the shared state)."""
+    found = load_candidate()
+    _publish(bump_generation=True)
+    return found
+
+
+def choose_pipeline(live_pipeline):
+    """Returns (pipeline, role) to answer this request with: 'live' or 'candidate'."""
+    candidate = CANDIDATE_PIPELINE
+    if candidate is not None and CANARY_PERCENT > 0 and random.random() * 100 < CANARY_PERCENT:
+        return candidate, "candidate"
+    return live_pipeline, "live"
+
+
+def submit(input_data, served_role: str, served_label, served_seconds: float):
+    """Queues the other model's prediction for comparison. Never blocks."""
+    if not is_active():
+        return
+    stats = STATS
+    if served_role == "candidate":
+        with stats.lock:
+            stats.canaried += 1
+    try:
+        _queue.put_nowait((stats, input_data, served_role, served_label, served_seconds))
+    except queue.Full:
+        with stats.lock:
+            stats.dropped += 1
+        SHADOW_DROPPED.inc()
+
+
+def _run():
+    from . import ml_artifacts
+
+    while True:
+        stats, input_data, served_role, served_label, served_seconds = _queue.get()
+        try:
+            other = ml_artifacts.ML_PIPELINE if served_role == "candidate" else CANDIDATE_PIPELINE
+            if other is None:
+                continue
+            started = time.perf_counter()
+            other_label = other.predict(input_data)[0]
+            other_seconds = time.perf_counter() - started
+            if served_role == "live":
+                stats.record(served_label, other_label, served_seconds, other_seconds)
+            else:
+                stats.record(other_label, served_label, other_seconds, served_seconds)
+        except Exception:
+            logger.exception("Shadow prediction failed")
+            with stats.lock:
+                stats.errors += 1
+        finally:
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="shadow-model-worker", daemon=True)
+            _worker.start()
+
+
+def drain(timeout: float = 5.0) -> bool:
+    """Waits until queued comparisons are processed (benchmarks / before promotion)."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return not _queue.unfinished_tasks
+
+
+def report() -> Dict[str, Any]:
+    from . import ml_artifacts
+
+    return {
+        "enabled": config.SHADOW_ENABLED,
+        "live_version": ml_artifacts.MODEL_VERSION,
+        "candidate_version": CANDIDATE_VERSION,
+        "canary_percent": CANARY_PERCENT,
+        "queue_depth": _queue.qsize(),
+        "queue_size": config.SHADOW_QUEUE_SIZE,
+        "stats": STATS.report() if CANDIDATE_PIPELINE is not None else None,
+    }
+
+
+def promote() -> Dict[str, Any]:
+    """
+    Makes the candidate the live model: candidate files replace the live ones
+    (which are kept as *_previous.pkl), this process reloads its artifacts and
+    the other workers follow through the shared state. Returns the final
+    report of the candidate that was promoted.
+    """
+    global CANDIDATE_PIPELINE, CANDIDATE_VERSION
+    from . import cache, ml_artifacts
+
+    if CANDIDATE_PIPELINE is None:
+        raise LookupError("No candidate model loaded")
+    drain()
+    final = report()
+
+    with _lock:
+        for name in ARTIFACT_FILES:
+            candidate = _candidate_path(name)
+            if not candidate.exists():
+                continue
+            live = config.ML_ARTIFACTS_DIR / name
+            if live.exists():
+                stem, ext = os.path.splitext(name)
+                os.replace(live, config.ML_ARTIFACTS_DIR / f"{stem}{PREVIOUS_SUFFIX}{ext}")
+            os.replace(candidate, live)
+        CANDIDATE_PIPELINE, CANDIDATE_VERSION = None, None
+
+    ml_artifacts.reload_artifacts()
+    cache.invalidate("model")
+    set_canary_percent(0, publish=False)
+    _publish(bump_generation=True, canary_percent=0.0)
+    logger.info("Promoted candidate model, live version is now %s", ml_artifacts.MODEL_VERSION)
+    return final
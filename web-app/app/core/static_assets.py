@@ -0,0 +1,217 @@
+"""
+Self-hosted, fingerprinted static assets.
+
+The third-party CSS/JS the pages use (Bootstrap, Bootstrap Icons, jQuery,
+Chart.js, DataTables) is vendored under static/vendor/ by
+`python -m app.jobs.build_static --download`, which also writes gzip and
+brotli variants next to every compressible file.
+
+Templates link assets through static_url('css/style.css'). It returns
+/static/css/style.<content hash>.css, and PrecompressedStaticFiles serves that
+name from the original file with an immutable Cache-Control header; a new
+version of a file gets a new URL. Files without a fingerprint in the URL are
+served with "no-cache" (revalidated through the ETag).
+
+A vendor asset that isn't vendored is linked to its pinned CDN URL, and
+check_vendor_assets() logs a warning about it at startup; with
+VENDOR_CDN_FALLBACK off it is a startup error instead.
+
+Hashes are computed once per process, on the first static_url() call.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import stat
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import pass_context
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# The app resolves templates/ and static/ relative to the working directory
+STATIC_DIR = Path("static")
+VENDOR_DIR = "vendor"
+FINGERPRINT_LENGTH = 10
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Only text formats are worth compressing (woff/woff2 already are)
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".map", ".svg", ".json", ".txt", ".html"}
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# static/vendor/<path> -> (CDN URL of the pinned version, SRI hash or None)
+VENDOR_ASSETS: Dict[str, Tuple[str, Optional[str]]] = {
+    "bootstrap/bootstrap.min.css": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css",
+        "sha384-QWTKZyjpPEjISv5WaRU9OFeRpok6YctnYmDr5pNlyT2bRjXh0JMhjY6hW+ALEwIH",
+    ),
+    "bootstrap/bootstrap.bundle.min.js": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js",
+        "sha384-YvpcrYf0tY3lHB60NNkmXc5s9fDVZLESaAA55NDzOxhy9GkcIdslK1eN7N6jIeHz",
+    ),
+    "bootstrap-icons/bootstrap-icons.min.css": (
+        "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.min.css", None,
+    ),
+    # Referenced by the icons stylesheet as ./fonts/...
+    "bootstrap-icons/fonts/bootstrap-icons.woff2": (
+        "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/fonts/bootstrap-icons.woff2", None,
+    ),
+    "bootstrap-icons/fonts/bootstrap-icons.woff": (
+        "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/fonts/bootstrap-icons.woff", None,
+    ),
+    "jquery/jquery-3.7.1.min.js": ("https://code.jquery.com/jquery-3.7.1.min.js", None),
+    "chart.js/chart.umd.min.js": ("https://cdn.jsdelivr.net/npm/chart.js@4.4.3/dist/chart.umd.min.js", None),
+    "datatables/dataTables.dataTables.min.css": (
+        "https://cdn.datatables.net/2.3.5/css/dataTables.dataTables.min.css", None,
+    ),
+    "datatables/dataTables.min.js": ("https://cdn.datatables.net/2.3.5/js/dataTables.min.js", None),
+}
+
+_FINGERPRINTED = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<suffix>\.[^./]+)$" % FINGERPRINT_LENGTH)
+
+_lock = threading.Lock()
+_manifest: Optional[Dict[str, str]] = None  # relative path -> content hash prefix
+
+
+def file_fingerprint(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def is_precompressed_variant(path: Path) -> bool:
+    return any(path.name.endswith(suffix) for _, suffix in ENCODINGS)
+
+
+def manifest() -> Dict[str, str]:
+    """Content hashes of the files under static/, computed on first use."""
+    global _manifest
+    if _manifest is None:
+        with _lock:
+            if _manifest is None:
+                hashes = {}
+                if STATIC_DIR.is_dir():
+                    for path in STATIC_DIR.rglob("*"):
+                        if path.is_file() and not is_precompressed_variant(path):
+                            hashes[path.relative_to(STATIC_DIR).as_posix()] = file_fingerprint(path)
+                _manifest = hashes
+    return _manifest
+
+
+def fingerprinted_path(path: str) -> Optional[str]:
+    """'css/style.css' -> 'css/style.<hash>.css', or None for unknown files."""
+    path = path.lstrip("/")
+    digest = manifest().get(path)
+    if digest is None:
+        return None
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}.{digest}{suffix}"
+
+
+def resolve_fingerprint(path: str) -> Tuple[str, bool]:
+    """
+    Maps a requested path back to the file on disk. Returns (path, current):
+    current is True when the URL carries the file's present hash.
+    """
+    match = _FINGERPRINTED.match(path)
+    if match:
+        original = match.group("stem") + match.group("suffix")
+        digest = manifest().get(original)
+        if digest is not None:
+            return original, digest == match.group("digest")
+    return path, False
+
+
+def missing_vendor_assets() -> List[str]:
+    """VENDOR_ASSETS paths that are not under static/vendor/."""
+    return [relative for relative in VENDOR_ASSETS if not (STATIC_DIR / VENDOR_DIR / relative).is_file()]
+
+
+def check_vendor_assets():
+    """
+    Warns about vendor assets missing from static/vendor/ (they are served from
+    the CDN), or raises RuntimeError for them when VENDOR_CDN_FALLBACK is off.
+    """
+    missing = missing_vendor_assets()
+    if not missing:
+        return
+    message = (f"Vendor assets missing from {STATIC_DIR / VENDOR_DIR}: {', '.join(missing)}. "
+               "Run `python -m app.jobs.build_static --download`.")
+    if not config.VENDOR_CDN_FALLBACK:
+        raise RuntimeError(message)
+    logger.warning("%s Linking their CDN URLs until then.", message)
+
+
+@pass_context
+def static_url(context, path: str) -> str:
+    """Jinja global: URL of a static file, fingerprinted when it exists on disk."""
+    path = path.lstrip("/")
+    fingerprinted = fingerprinted_path(path)
+    if fingerprinted is None and config.VENDOR_CDN_FALLBACK and path.startswith(VENDOR_DIR + "/"):
+        vendored = VENDOR_ASSETS.get(path[len(VENDOR_DIR) + 1:])
+        if vendored is not None:
+            return vendored[0]
+    return str(context["request"].url_for("static", path=fingerprinted or path))
+
+
+def _accepted_encodings(scope) -> set:
+    accept = Headers(scope=scope).get("accept-encoding", "")
+    accepted = set()
+    for part in accept.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that understands fingerprinted names, serves the .br/.gz
+    variant a client accepts and sets Cache-Control per file.
+    """
+
+    async def get_response(self, path: str, scope):
+        # An outdated hash (page cached across a deploy) still gets today's file,
+        # but only the current hash is marked immutable
+        path, current = resolve_fingerprint(path)
+
+        response = None
+        if Path(path).suffix in COMPRESSIBLE_SUFFIXES and scope["method"] in ("GET", "HEAD"):
+            accepted = _accepted_encodings(scope)
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await run_in_threadpool(self.lookup_path, path + suffix)
+                if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                    continue
+                _, source_stat = await run_in_threadpool(self.lookup_path, path)
+                if source_stat is not None and source_stat.st_mtime > stat_result.st_mtime:
+                    continue  # stale variant, the source changed after the build
+                response = self.file_response(full_path, stat_result, scope)
+                if response.status_code == 200:
+                    # Describe the original file, not the .br/.gz one
+                    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    if media_type.startswith("text/") or media_type == "application/javascript":
+                        media_type += "; charset=utf-8"
+                    response.headers["content-type"] = media_type
+                    response.headers["content-encoding"] = encoding
+                break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        if Path(path).suffix in COMPRESSIBLE_SUFFIXES:
+            response.headers["vary"] = "Accept-Encoding"
+        if response.status_code in (200, 304):
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if current else REVALIDATE_CACHE_CONTROL
+        return response
@@ -0,0 +1,68 @@
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+from . import config, static_assets
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 16 * 1024
+PRECOMPILE_PREFIX = "pages/"
+
+
+def create_templates(directory: str = "templates") -> Jinja2Templates:
+    """Jinja2Templates with the bytecode cache and the static_url() global."""
+    templates = Jinja2Templates(directory=directory)
+    if config.JINJA_BYTECODE_CACHE_DIR:
+        os.makedirs(config.JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+        templates.env.bytecode_cache = FileSystemBytecodeCache(config.JINJA_BYTECODE_CACHE_DIR)
+    templates.env.globals["static_url"] = static_assets.static_url
+    return templates
+
+
+# Shared by all routers, so a template is compiled (or read from the bytecode cache) once per process
+templates = create_templates()
+
+
+def precompile(prefix: str = PRECOMPILE_PREFIX) -> int:
+    """Loads every template under `prefix` and the top-level layouts they extend. Returns the count."""
+    started = time.perf_counter()
+    names = templates.env.list_templates(filter_func=lambda name: name.startswith(prefix) or "/" not in name)
+    for name in names:
+        templates.get_template(name)
+    logger.info("Compiled %s templates in %.1f ms", len(names), (time.perf_counter() - started) * 1000)
+    return len(names)
+
+
+def _buffered(chunks: Iterator[str], size: int) -> Iterator[bytes]:
+    """Coalesces Jinja's many tiny output pieces into socket-sized writes."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def stream_template(templates: Jinja2Templates, name: str, context: Dict[str, Any],
+                    status_code: int = 200) -> StreamingResponse:
+    """
+    Renders a template with Jinja's generate() so the head of the page is sent
+    while the rest of the table is still being rendered.
+    The context must contain "request" (url_for relies on it).
+    """
+    template = templates.get_template(name)
+    return StreamingResponse(
+        _buffered(template.generate(context), STREAM_CHUNK_SIZE),
+        status_code=status_code,
+        media_type="text/html",
+    )
@@ -0,0 +1,171 @@
+"""
+Dry-run validation and column profiling of student CSV uploads.
+
+The whole file is checked with vectorized pandas operations and the database
+is never touched:
+  - types as StudentDataCreate would coerce them (int / float / required str)
+  - categorical domains (schemas.STUDENT_FIELD_CHOICES, i.e. dataset.CHOICES)
+  - ranges of the discrete numeric fields (schemas.STUDENT_FIELD_RANGES)
+
+Type errors are rows the real import would reject. Out-of-domain values would
+be imported, but fall outside the values the model was trained on, so they are
+reported as well.
+"""
+from io import BytesIO
+from typing import Any, Dict, List, Tuple
+
+from ..schemas.student import StudentDataCreate, STUDENT_FIELD_CHOICES, STUDENT_FIELD_RANGES
+
+MAX_REPORTED_ROWS = 100
+TOP_VALUES = 10
+
+
+def _field_kinds() -> Dict[str, Tuple[str, bool]]:
+    """'int', 'float' or 'str' per field, and whether it is required, from the schema."""
+    kinds = {}
+    for name, field in StudentDataCreate.model_fields.items():
+        annotation = field.annotation
+        kind = "int" if annotation is int else "float" if annotation is float else "str"
+        kinds[name] = (kind, field.is_required())
+    return kinds
+
+
+FIELD_KINDS = _field_kinds()
+EXPECTED_HEADERS = list(FIELD_KINDS)
+
+
+def _number(value: float):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _label(value) -> str:
+    return str(_number(value)) if isinstance(value, float) else str(value)
+
+
+def _top(values, counts, selected, limit: int = TOP_VALUES) -> Dict[str, int]:
+    """Most frequent selected unique values. Equal values (e.g. '1' and '1.0') are merged."""
+    import pandas as pd
+
+    totals = pd.Series(counts[selected], index=[_label(value) for value in values[selected]])
+    totals = totals.groupby(level=0).sum().sort_values(ascending=False, kind="stable").head(limit)
+    return {key: int(value) for key, value in totals.items()}
+
+
+def validate_csv(content: bytes, max_reported_rows: int = MAX_REPORTED_ROWS) -> Dict[str, Any]:
+    """
+    Profiles and validates an uploaded CSV. Returns
+    {"rows", "valid_rows", "rejected_rows", "bad_row_count", "bad_rows", "columns", "header_error"}
+    where bad_rows lists at most `max_reported_rows` entries of
+    {"row": file line number, "problems": [...]}.
+    """
+    import numpy as np
+    import pandas as pd
+
+    try:
+        # Everything as text; the checks below do the typing
+        df = pd.read_csv(BytesIO(content), dtype=str, keep_default_na=False, na_values=[""])
+    except Exception as e:
+        return {"header_error": f"Error reading CSV: {e}", "rows": 0, "columns": {}, "bad_rows": []}
+
+    # Same rule as the import: exact header names and order
+    headers = list(df.columns)
+    if headers != EXPECTED_HEADERS:
+        missing = [h for h in EXPECTED_HEADERS if h not in headers]
+        extra = [h for h in headers if h not in EXPECTED_HEADERS]
+        return {
+            "header_error": f"Header mismatch. Missing columns: {missing}. Extra columns found: {extra}.",
+            "rows": len(df), "columns": {}, "bad_rows": [],
+        }
+
+    n_rows = len(df)
+    columns: Dict[str, Any] = {}
+    problems: Dict[str, Dict[str, Any]] = {}  # column -> {"type": mask, "domain": mask}
+    for name, (kind, required) in FIELD_KINDS.items():
+        # Columns have few distinct values: every check runs on the uniques and
+        # is broadcast back to the rows through the factorized codes
+        codes, uniques = pd.factorize(df[name], use_na_sentinel=True)
+        uniques = pd.Series(uniques, dtype=object).str.strip()
+        uniques = uniques.mask(uniques == "")  # whitespace-only cells count as missing
+        unique_nulls = uniques.isna().to_numpy()
+        present = codes >= 0
+        nulls = ~present
+        nulls[present] = unique_nulls[codes[present]]
+        counts = np.bincount(codes[present], minlength=len(uniques))
+
+        def per_row(unique_mask) -> np.ndarray:
+            mask = np.zeros(n_rows, dtype=bool)
+            mask[present] = np.asarray(unique_mask, dtype=bool)[codes[present]]
+            return mask
+
+        profile: Dict[str, Any] = {"type": kind, "nulls": int(nulls.sum())}
+        unique_type_error = np.zeros(len(uniques), dtype=bool)
+        if kind in ("int", "float"):
+            values = pd.to_numeric(uniques, errors="coerce")
+            unique_type_error |= (values.isna() & ~unique_nulls).to_numpy()
+            if kind == "int":
+                unique_type_error |= (values.notna() & (values % 1 != 0)).to_numpy()
+            usable = values.notna().to_numpy() & ~unique_type_error
+            if name in STUDENT_FIELD_RANGES:
+                low, high = STUDENT_FIELD_RANGES[name]
+                unique_domain_error = usable & ((values < low) | (values > high)).to_numpy()
+                profile["domain"] = [low, high]
+            elif name in STUDENT_FIELD_CHOICES:
+                unique_domain_error = usable & ~values.isin(STUDENT_FIELD_CHOICES[name]).to_numpy()
+                profile["domain"] = STUDENT_FIELD_CHOICES[name]
+            else:
+                unique_domain_error = np.zeros(len(uniques), dtype=bool)
+            weights = counts[usable]
+            if weights.sum():
+                numbers = values[usable].to_numpy(dtype=np.float64)
+                profile.update(min=_number(numbers.min()), max=_number(numbers.max()),
+                               mean=round(float(np.average(numbers, weights=weights)), 3))
+            display = values
+        else:
+            if name in STUDENT_FIELD_CHOICES:
+                unique_domain_error = ~unique_nulls & ~uniques.isin(STUDENT_FIELD_CHOICES[name]).to_numpy()
+                profile["domain"] = STUDENT_FIELD_CHOICES[name]
+            else:
+                unique_domain_error = np.zeros(len(uniques), dtype=bool)
+            display = uniques
+
+        type_error = per_row(unique_type_error)
+        if required:
+            type_error |= nulls
+        domain_error = per_row(unique_domain_error)
+        profile["invalid"] = int((type_error & ~nulls).sum())
+        profile["out_of_domain"] = int(domain_error.sum())
+        if profile["out_of_domain"]:
+            profile["out_of_domain_values"] = _top(display, counts, unique_domain_error)
+        profile["distribution"] = _top(display, counts, ~unique_type_error & ~unique_domain_error & ~unique_nulls)
+        columns[name] = profile
+        problems[name] = {"type": type_error, "domain": domain_error}
+
+    bad = np.zeros(n_rows, dtype=bool)
+    rejected = np.zeros(n_rows, dtype=bool)
+    for masks in problems.values():
+        bad |= masks["type"] | masks["domain"]
+        rejected |= masks["type"]
+
+    bad_rows: List[Dict[str, Any]] = []
+    for position in np.flatnonzero(bad)[:max_reported_rows]:
+        row_problems = []
+        for name, masks in problems.items():
+            value = df[name].iat[position]
+            if masks["type"][position]:
+                row_problems.append(f"{name}: missing" if value is None or value != value
+                                    else f"{name}: '{value}' is not a valid {FIELD_KINDS[name][0]}")
+            elif masks["domain"][position]:
+                row_problems.append(f"{name}: '{value}' is outside the expected values")
+        # +2: header line and 1-based line numbers, as in the import report
+        bad_rows.append({"row": int(position) + 2, "problems": row_problems})
+
+    return {
+        "header_error": None,
+        "rows": n_rows,
+        "valid_rows": int(n_rows - bad.sum()),
+        "rejected_rows": int(rejected.sum()),
+        "bad_row_count": int(bad.sum()),
+        "bad_rows": bad_rows,
+        "columns": columns,
+    }
@@ -0,0 +1,205 @@
+"""
+Group commit for single-record student submissions.
+
+Every form submission normally runs its own INSERT + COMMIT (one fsync, one
+pooled connection held for the whole transaction). When many invitees submit
+at once those transactions queue up on the table lock and the pool.
+
+With GROUP_COMMIT_ENABLED the handler hands its validated record to a single
+writer thread and waits. The writer takes the first queued record, keeps
+collecting until GROUP_COMMIT_MAX_SIZE records or GROUP_COMMIT_MAX_WAIT_MS
+have passed, and inserts the group with crud_student.create_student_records():
+one executemany INSERT and one commit. Only then are the waiting requests
+answered, so an acknowledged row is always durable; the group's drift
+histogram increments are applied after that, off the requests' latency. Under light load a group
+is a single record and the extra latency is at most the wait window.
+
+If a group fails, its records are retried one transaction each so a single bad
+record only fails its own request. A request that gives up waiting
+(GROUP_COMMIT_TIMEOUT_SECONDS) withdraws its record if it is still queued;
+once the writer has claimed a record for a group it is written regardless.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from . import config, metrics
+from ..schemas.student import StudentDataCreate
+
+logger = logging.getLogger(__name__)
+
+GROUP_COMMIT_SIZE = metrics.register(metrics.Histogram(
+    "group_commit_records", "Records inserted per group commit", (),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)))
+GROUP_COMMIT_LATENCY = metrics.register(metrics.Histogram(
+    "group_commit_duration_seconds", "INSERT + COMMIT time of one group", (),
+    buckets=metrics.FAST_BUCKETS))
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(self, max_size: int = None, max_wait_ms: float = None):
+        self.max_size = max(1, max_size or config.GROUP_COMMIT_MAX_SIZE)
+        self.max_wait = (config.GROUP_COMMIT_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._lock = threading.Lock()
+        self.groups = 0
+        self.records = 0
+
+    def start(self):
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._thread is not None and self._thread.is_alive():
+            if not self._stopping:
+                return
+            # stop() timed out: the old writer must finish its queue before another one reads it
+            self._thread.join()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Commits what is still queued and stops the writer."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._stopping = True
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, record: StudentDataCreate) -> Future:
+        """Queues a record. The future resolves to its Student_ID once committed."""
+        future: Future = Future()
+        # Under the lock, so a record is never queued behind _STOP with no writer left to read it
+        with self._lock:
+            self._start_locked()
+            self._queue.put((record, future))
+        return future
+
+    async def add(self, record: StudentDataCreate, timeout: float = None) -> int:
+        """
+        submit() for async handlers: waits without blocking the event loop.
+        Raises TimeoutError if the record is still queued after `timeout` seconds
+        (default GROUP_COMMIT_TIMEOUT_SECONDS, 0 = no limit); it is then withdrawn
+        and never written. A record already being committed is waited for.
+        """
+        timeout = config.GROUP_COMMIT_TIMEOUT_SECONDS if timeout is None else timeout
+        future = self.submit(record)
+        waiter = asyncio.wrap_future(future)
+        done, _ = await asyncio.wait({waiter}, timeout=timeout or None)
+        if not done and future.cancel():
+            raise TimeoutError(f"Submission not committed within {timeout} s; it was withdrawn")
+        return await waiter
+
+    def _collect(self):
+        """Blocks for the first record, then gathers more until the size or time bound."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None, True
+        group = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(group) < self.max_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+        return group, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            # Nothing may end the thread early: queued requests would wait forever
+            try:
+                group, stopping = self._collect()
+                if group:
+                    self._commit(group)
+            except Exception:
+                logger.exception("Group commit writer error")
+        # Anything submitted while stopping still gets written
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.max_size):
+            self._commit(leftover[start:start + self.max_size])
+
+    def _commit(self, group):
+        # Withdrawn (cancelled) submissions are dropped; the rest can't be cancelled any more
+        group = [(record, future) for record, future in group if future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        try:
+            self._write(group)
+        except Exception as e:
+            logger.exception("Group commit of %s records failed", len(group))
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _write(self, group):
+        from .database import SessionLocal
+        from ..crud import crud_student
+
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                ids = crud_student.create_student_records(
+                    db, [record for record, _ in group], update_histograms=False)
+        except Exception:
+            logger.exception("Group commit of %s records failed, retrying them one by one", len(group))
+            written = []
+            for record, future in group:
+                try:
+                    with SessionLocal() as db:
+                        future.set_result(crud_student.create_student_records(
+                            db, [record], update_histograms=False)[0])
+                    written.append(record)
+                except Exception as e:
+                    future.set_exception(e)
+            self._update_histograms(written)
+            return
+        GROUP_COMMIT_LATENCY.observe(time.perf_counter() - started)
+        GROUP_COMMIT_SIZE.observe(len(group))
+        self.groups += 1
+        self.records += len(group)
+        for (_, future), student_id in zip(group, ids):
+            future.set_result(student_id)
+        self._update_histograms([record for record, _ in group])
+
+    def _update_histograms(self, records):
+        """Drift counts for a committed group, after its requests have been answered."""
+        from .database import SessionLocal
+        from ..crud import crud_drift
+
+        if records and config.DRIFT_ENABLED:
+            with SessionLocal() as db:
+                crud_drift.increment_histograms(db, [record.model_dump() for record in records])
+
+    def stats(self):
+        return {
+            "groups": self.groups,
+            "records": self.records,
+            "mean_group_size": round(self.records / self.groups, 2) if self.groups else None,
+            "queued": self._queue.qsize(),
+        }
+
+
+WRITER = GroupCommitWriter()
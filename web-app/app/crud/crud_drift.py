@@ -0,0 +1,131 @@
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable
+from sqlalchemy import bindparam, delete, func, insert, select, text, update
+from sqlalchemy.orm import Session
+from ..core.drift import FEATURES, feature_value_key
+from ..core.locks import advisory_lock
+from ..models.feature_histogram import FeatureHistogram
+from ..models.student import StudentData as StudentModel
+
+logger = logging.getLogger(__name__)
+
+def _upsert_counts(db: Session, counts: Counter):
+    """
+    Adds counts to feature_histograms in one executemany statement. Rows are
+    touched in (feature, value) order, so concurrent writers lock them in the
+    same order and can't deadlock each other.
+    """
+    table = FeatureHistogram.__table__
+    params = [{"f": feature, "v": value, "n": n} for (feature, value), n in sorted(counts.items())]
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(feature=bindparam("f"), value=bindparam("v"), count=bindparam("n"))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.feature, table.c.value],
+            set_={"count": table.c.count + stmt.excluded.count},
+        )
+        db.execute(stmt, params)
+        return
+
+    # Portable fallback: update, then insert the buckets that didn't exist yet
+    for row in params:
+        result = db.execute(
+            update(table).where(table.c.feature == row["f"], table.c.value == row["v"])
+            .values(count=table.c.count + row["n"])
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(feature=row["f"], value=row["v"], count=row["n"]))
+
+def increment_histograms(db: Session, records: Iterable[Dict[str, Any]]):
+    """
+    Adds records the caller has already committed to the live feature
+    histograms, in a short transaction of its own, O(features) per row.
+
+    Keeping it out of the insert transaction means the shared counter rows are
+    locked only for this one statement, not while the records are written. A
+    failure is logged rather than raised (the records are stored either way);
+    the startup check (initialize_histograms) rebuilds counts that drifted.
+    """
+    counts = Counter()
+    for record in records:
+        for feature in FEATURES:
+            counts[(feature, feature_value_key(record.get(feature)))] += 1
+    if not counts:
+        return
+    try:
+        _upsert_counts(db, counts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Could not update the drift histograms for %s records", sum(counts.values()) // len(FEATURES))
+
+def get_live_histograms(db: Session) -> Dict[str, Dict[str, int]]:
+    histograms: Dict[str, Dict[str, int]] = {}
+    for feature, value, count in db.execute(
+        select(FeatureHistogram.feature, FeatureHistogram.value, FeatureHistogram.count)
+    ):
+        histograms.setdefault(feature, {})[value] = count
+    return histograms
+
+def histograms_in_sync(db: Session) -> bool:
+    """
+    True when the histograms cover every stored record (one feature's counts
+    sum to the row count). False after records were written with DRIFT_ENABLED
+    off, or before the first build.
+    """
+    counted = db.execute(
+        select(func.coalesce(func.sum(FeatureHistogram.count), 0)).where(FeatureHistogram.feature == FEATURES[0])
+    ).scalar()
+    return counted == db.query(func.count(StudentModel.Student_ID)).scalar()
+
+def rebuild_histograms(db: Session) -> int:
+    """
+    Replaces the histograms with counts from all stored records (GROUP BY per
+    feature) in one transaction. Returns the number of records counted.
+
+    The DELETE comes first: on PostgreSQL the table is locked for the rest of
+    the transaction, so concurrent increments wait until it commits; SQLite
+    serializes writers anyway. Records committed just before the rebuild whose
+    increment is still pending can be counted twice; the next startup check
+    notices and rebuilds again.
+    """
+    table = FeatureHistogram.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {table.name} IN EXCLUSIVE MODE"))
+    db.execute(delete(table))
+
+    counts = Counter()
+    for feature in FEATURES:
+        column = StudentModel.__table__.c[feature]
+        for value, n in db.execute(select(column, func.count()).group_by(column)):
+            counts[(feature, feature_value_key(value))] += n
+    if counts:
+        _upsert_counts(db, counts)
+    db.commit()
+    return sum(n for (feature, _), n in counts.items() if feature == FEATURES[0])
+
+def initialize_histograms(db: Session) -> bool:
+    """
+    Startup check: rebuilds the histograms if they don't match the stored
+    records. Runs under a cross-process lock, so of several workers starting
+    together one rebuilds and the others find them in sync. Returns True if it
+    rebuilt them.
+    """
+    with advisory_lock(db.get_bind(), "feature_histograms"):
+        if histograms_in_sync(db):
+            db.rollback()
+            return False
+        rebuild_histograms(db)
+        return True
+
+def current_drift_report(db: Session) -> Dict[str, Any]:
+    """Drift of the stored records against the loaded model's training data."""
+    from ..core import drift, ml_artifacts
+
+    return drift.drift_report(ml_artifacts.ML_FEATURE_REFERENCE, get_live_histograms(db))
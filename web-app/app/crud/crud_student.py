@@ -1,8 +1,37 @@
 from sqlalchemy.orm import Session
 from app.models.student import StudentData as StudentModel
 from app.schemas.student import StudentDataCreate
-from sqlalchemy import func, text
-from typing import Dict, Any
+from app.core import cache, config
+from app.crud import crud_drift, data_version
+from sqlalchemy import func, text, select, insert, update, bindparam, and_, or_
+from typing import Dict, Any, Optional, Tuple, List
+import hashlib
+
+# Fields that make up a record's identity for duplicate detection (all data fields)
+FINGERPRINT_FIELDS = (
+    'Student_Age', 'Sex', 'High_School_Type', 'Scholarship', 'Additional_Work',
+    'Sports_activity', 'Transportation', 'Weekly_Study_Hours', 'Attendance',
+    'Reading', 'Notes', 'Listening_in_Class', 'Project_work', 'Grade'
+)
+IMPORT_CHUNK_SIZE = 1000
+# Columns analytics can group by (categorical fields plus the discrete numeric ones)
+GROUPABLE_COLUMNS = (
+    'Student_Age', 'Sex', 'High_School_Type', 'Scholarship', 'Additional_Work',
+    'Sports_activity', 'Transportation', 'Attendance', 'Reading', 'Notes',
+    'Listening_in_Class', 'Project_work', 'Grade'
+)
+
+def _normalize(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().casefold()
+
+def record_fingerprint(data: Dict[str, Any]) -> str:
+    """SHA-256 over the normalized field values ('Yes ' == 'yes', 5.0 == 5)."""
+    joined = "\x1f".join(_normalize(data.get(field)) for field in FINGERPRINT_FIELDS)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
 
 def get_student(db: Session, student_id: int):
     return db.query(StudentModel).filter(StudentModel.Student_ID == student_id).first()
@@ -10,18 +39,185 @@ def get_student(db: Session, student_id: int):
 def get_students(db: Session, limit: int = 100, offset: int = 0):
     return db.query(StudentModel).offset(offset).limit(limit).all()
 
+SORTABLE_COLUMNS = tuple(col.name for col in StudentModel.__table__.columns if col.name != "Record_Hash")
+
+def get_students_page(
+    db: Session,
+    limit: int = 50,
+    sort: str = "Student_ID",
+    descending: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    before: Optional[Tuple[Any, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Keyset (seek) pagination ordered by (sort column, Student_ID).
+
+    `after`/`before` are the (sort value, Student_ID) of the last/first row of the
+    page the user navigates from, so every page costs the same regardless of
+    depth. Returns plain rows plus the cursors of the adjacent pages.
+    """
+    table = StudentModel.__table__
+    id_col = table.c.Student_ID
+    sort_col = table.c[sort]
+    # Nullable columns are compared through COALESCE so NULL rows stay reachable
+    if sort_col.nullable and not sort_col.primary_key:
+        sort_col = func.coalesce(sort_col, "")
+
+    stmt = select(table)
+    for name, value in (filters or {}).items():
+        stmt = stmt.where(table.c[name] == value)
+
+    backwards = before is not None
+    cursor = before if backwards else after
+    ascending = descending == backwards
+
+    if cursor is not None:
+        value, last_id = cursor
+        if sort == "Student_ID":
+            stmt = stmt.where(id_col > last_id if ascending else id_col < last_id)
+        elif ascending:
+            stmt = stmt.where(or_(sort_col > value, and_(sort_col == value, id_col > last_id)))
+        else:
+            stmt = stmt.where(or_(sort_col < value, and_(sort_col == value, id_col < last_id)))
+
+    if sort == "Student_ID":
+        order = [id_col.asc() if ascending else id_col.desc()]
+    else:
+        order = [sort_col.asc(), id_col.asc()] if ascending else [sort_col.desc(), id_col.desc()]
+
+    rows = db.execute(stmt.order_by(*order).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def key(row):
+        return (getattr(row, sort) if getattr(row, sort) is not None else "", row.Student_ID)
+
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else cursor is not None
+    return {
+        "rows": rows,
+        "next": key(rows[-1]) if rows and has_next else None,
+        "prev": key(rows[0]) if rows and has_prev else None,
+    }
+
 def create_student_record(db: Session, record: StudentDataCreate):
     # We use .model_dump() to convert the Pydantic model to a dictionary for SQLAlchemy
-    db_student = StudentModel(**record.model_dump())
+    data = record.model_dump()
+    db_student = StudentModel(**data, Record_Hash=record_fingerprint(data))
     db.add(db_student)
     db.commit()
+    cache.invalidate("students")
     db.refresh(db_student)
+    if config.DRIFT_ENABLED:
+        crud_drift.increment_histograms(db, [data])
     return db_student
 
+def create_student_records(
+    db: Session, records: List[StudentDataCreate], update_histograms: bool = True
+) -> List[int]:
+    """
+    Inserts several single-record submissions in one transaction (group commit,
+    see core.write_buffer): one executemany INSERT ... RETURNING and one commit.
+    Returns the new Student_IDs in the order of `records`. With
+    update_histograms=False the caller applies the drift increments itself.
+    """
+    rows = []
+    for record in records:
+        data = record.model_dump()
+        data["Record_Hash"] = record_fingerprint(data)
+        rows.append(data)
+    table = StudentModel.__table__
+    ids = db.execute(
+        insert(table).returning(table.c.Student_ID, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    db.commit()
+    cache.invalidate("students")
+    if update_histograms and config.DRIFT_ENABLED:
+        crud_drift.increment_histograms(db, rows)
+    return list(ids)
+
+def import_student_records(
+    db: Session, records: List[StudentDataCreate], chunk_size: int = IMPORT_CHUNK_SIZE,
+    skip_duplicates: bool = False,
+) -> Dict[str, Any]:
+    """
+    Inserts validated records in chunked transactions and reports the ones
+    whose content matches an existing record (or an earlier row of the same
+    batch).
+
+    Identical answers don't mean the same student, so such records are still
+    inserted unless skip_duplicates is set (an explicit opt-in). Protection
+    against importing the same file twice is the file checksum claim in
+    crud.data_import, not this check.
+
+    Each chunk costs one IN (...) lookup against the Record_Hash index and one
+    executemany INSERT, instead of a query and a commit per row. Returns the
+    inserted count and the positions (indexes into `records`) of the content
+    duplicates, skipped or not.
+    """
+    imported = 0
+    duplicate_positions = []
+    for start in range(0, len(records), chunk_size):
+        rows = []
+        for record in records[start:start + chunk_size]:
+            data = record.model_dump()
+            data["Record_Hash"] = record_fingerprint(data)
+            rows.append(data)
+
+        hashes = {row["Record_Hash"] for row in rows}
+        seen = set(db.scalars(
+            select(StudentModel.Record_Hash).where(StudentModel.Record_Hash.in_(hashes))
+        ))
+        fresh = []
+        for offset, row in enumerate(rows):
+            if row["Record_Hash"] in seen:
+                duplicate_positions.append(start + offset)
+                if skip_duplicates:
+                    continue
+            seen.add(row["Record_Hash"])
+            fresh.append(row)
+
+        if fresh:
+            db.execute(insert(StudentModel), fresh)
+        db.commit()
+        if fresh and config.DRIFT_ENABLED:
+            crud_drift.increment_histograms(db, fresh)
+        imported += len(fresh)
+
+    if imported:
+        cache.invalidate("students")
+    return {"imported": imported, "duplicate_positions": duplicate_positions}
+
+def backfill_record_hashes(db: Session, chunk_size: int = IMPORT_CHUNK_SIZE) -> int:
+    """Computes Record_Hash for rows that predate the column. Returns the number updated."""
+    table = StudentModel.__table__
+    updated = 0
+    while True:
+        rows = db.execute(
+            select(table).where(table.c.Record_Hash.is_(None)).limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+        db.execute(
+            update(table).where(table.c.Student_ID == bindparam("row_id"))
+            .values(Record_Hash=bindparam("row_hash")),
+            [{"row_id": row["Student_ID"], "row_hash": record_fingerprint(row)} for row in rows],
+        )
+        data_version.bump(db, "students")
+        db.commit()
+        updated += len(rows)
+    return updated
+
 def calculate_data_quality_metrics(db: Session) -> Dict[str, Any]:
     """
     Calculates various data quality and submission metrics from the StudentModel table.
     """
+    if config.COLUMNAR_CACHE_ENABLED:
+        from app.core import columnar
+        return columnar.get_snapshot(db).data_quality_metrics()
     
     # 1. Total Records and Uniqueness
     total_records = db.query(StudentModel).count()
@@ -31,13 +227,19 @@ def calculate_data_quality_metrics(db: Session) -> Dict[str, Any]:
             "total_records": 0,
             "completion_rate": 0,
             "unique_student_ids": 0,
+            "duplicate_records": 0,
             "missing_values": 0,
             "invitee_submissions": 0, # Added invitee_submissions
             "age_distribution": []
         }
 
-    # Assuming Student_ID is the unique identifier
-    unique_student_ids = db.query(StudentModel.Student_ID).distinct().count()
+    # Student_ID is an autoincrement key, so uniqueness is judged by content:
+    # distinct fingerprints, plus rows that have none yet (counted individually)
+    unique_fingerprints, unhashed = db.query(
+        func.count(func.distinct(StudentModel.Record_Hash)),
+        func.count().filter(StudentModel.Record_Hash.is_(None)),
+    ).one()
+    unique_student_ids = unique_fingerprints + unhashed
 
     # 2. Data Completeness (Missing Values)
     
@@ -112,8 +314,27 @@ def calculate_data_quality_metrics(db: Session) -> Dict[str, Any]:
         "total_records": total_records,
         "completion_rate": completion_rate,
         "unique_student_ids": unique_student_ids,
+        "duplicate_records": total_records - unique_student_ids,
         "missing_values": missing_values_count,
         "invitee_submissions": invitee_submissions, # Added back
         "age_distribution": age_distribution_list
     }
 
+
+
+def group_counts(db: Session, column: str, by: str) -> Dict[Any, Dict[Any, int]]:
+    """Record counts per (column, by) value pair, e.g. Sex x Grade."""
+    if config.COLUMNAR_CACHE_ENABLED:
+        from app.core import columnar
+        return columnar.get_snapshot(db).crosstab(column, by)
+
+    table = StudentModel.__table__
+    result: Dict[Any, Dict[Any, int]] = {}
+    rows = db.execute(
+        select(table.c[column], table.c[by], func.count())
+        .where(table.c[column].is_not(None), table.c[by].is_not(None))
+        .group_by(table.c[column], table.c[by])
+    )
+    for value, by_value, count in rows:
+        result.setdefault(value, {})[by_value] = count
+    return result
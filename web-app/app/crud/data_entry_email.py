@@ -1,9 +1,12 @@
 # app/crud/data_entry_email.py
 
 from sqlalchemy.orm import Session
-from ..models.data_entry_email import EmailLog
+from sqlalchemy import select, insert, delete, func, literal, and_, or_, DateTime
+from ..models.data_entry_email import EmailLog, EmailLogArchive
 import datetime
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+
+ARCHIVE_BATCH_SIZE = 1000
 
 def log_email_invitation(db: Session, email: str, link: str, status: str = "SENT"):
     """
@@ -19,6 +22,124 @@ def log_email_invitation(db: Session, email: str, link: str, status: str = "SENT
     db.add(db_log)
     return db_log
 
-def get_email_logs(db: Session) -> List[EmailLog]:
-    """Retrieves all email logs, ordered by newest first."""
-    return db.query(EmailLog).order_by(EmailLog.send_time.desc()).all()
\ No newline at end of file
+def get_email_logs(db: Session, limit: Optional[int] = None) -> List[EmailLog]:
+    """Retrieves email logs, ordered by newest first."""
+    query = db.query(EmailLog).order_by(EmailLog.send_time.desc(), EmailLog.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+def _apply_filters(stmt, status: Optional[str], recipient: Optional[str]):
+    if status:
+        stmt = stmt.where(EmailLog.status == status)
+    if recipient:
+        stmt = stmt.where(EmailLog.recipient_email == recipient)
+    return stmt
+
+def get_email_logs_page(
+    db: Session,
+    limit: int = 50,
+    status: Optional[str] = None,
+    recipient: Optional[str] = None,
+    after: Optional[Tuple[datetime.datetime, int]] = None,
+    before: Optional[Tuple[datetime.datetime, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Keyset pagination over (send_time, id), newest first.
+
+    `after`/`before` are the (send_time, id) of the last/first row of the page the
+    user navigates from. Each page is a range scan on one of the composite
+    indexes, whatever the page depth. Returns rows plus adjacent page cursors.
+    """
+    table = EmailLog.__table__
+    stmt = _apply_filters(select(table), status, recipient)
+
+    backwards = before is not None
+    cursor = before if backwards else after
+    if cursor is not None:
+        send_time, last_id = cursor
+        if backwards:
+            stmt = stmt.where(or_(table.c.send_time > send_time,
+                                  and_(table.c.send_time == send_time, table.c.id > last_id)))
+        else:
+            stmt = stmt.where(or_(table.c.send_time < send_time,
+                                  and_(table.c.send_time == send_time, table.c.id < last_id)))
+
+    if backwards:
+        order = [table.c.send_time.asc(), table.c.id.asc()]
+    else:
+        order = [table.c.send_time.desc(), table.c.id.desc()]
+
+    rows = db.execute(stmt.order_by(*order).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else cursor is not None
+    return {
+        "rows": rows,
+        "next": (rows[-1].send_time, rows[-1].id) if rows and has_next else None,
+        "prev": (rows[0].send_time, rows[0].id) if rows and has_prev else None,
+    }
+
+def count_email_logs_by_status(db: Session, recipient: Optional[str] = None) -> Dict[str, int]:
+    """Number of log rows per status, from one GROUP BY query."""
+    stmt = _apply_filters(select(EmailLog.status, func.count()), None, recipient).group_by(EmailLog.status)
+    return {status: count for status, count in db.execute(stmt)}
+
+def _archive_copy(db: Session, ids: List[int], columns: List[str], archived_at: datetime.datetime):
+    """INSERT ... SELECT of the given log rows into the archive, skipping ones already there."""
+    hot = EmailLog.__table__
+    archive = EmailLogArchive.__table__
+    rows = (
+        select(hot.c.id, *[hot.c[name] for name in columns], literal(archived_at, DateTime))
+        .where(hot.c.id.in_(ids))
+    )
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(archive).from_select(["log_id", *columns, "archived_at"], rows) \
+            .on_conflict_do_nothing(index_elements=[archive.c.log_id])
+
+    # Portable fallback: leave out the ids that are already archived
+    already = select(archive.c.log_id).where(archive.c.log_id == hot.c.id).exists()
+    return insert(archive).from_select(["log_id", *columns, "archived_at"], rows.where(~already))
+
+def archive_email_logs(
+    db: Session,
+    older_than: datetime.datetime,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Moves log rows sent before `older_than` into email_invitation_logs_archive.
+    Works oldest first in batches of `batch_size`, committing each batch (an
+    INSERT ... SELECT plus a DELETE by id), so locks stay short. Returns the
+    number of rows moved.
+
+    The copy skips rows whose log_id is already archived (ON CONFLICT DO
+    NOTHING), so a batch that overlaps another archiver's is not duplicated.
+    """
+    hot = EmailLog.__table__
+    archive = EmailLogArchive.__table__
+    columns = ["recipient_email", "send_time", "status", "form_link"]
+    archived_at = datetime.datetime.utcnow()
+    moved = 0
+    while True:
+        ids = db.execute(
+            select(hot.c.id)
+            .where(hot.c.send_time < older_than)
+            .order_by(hot.c.send_time, hot.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.execute(_archive_copy(db, ids, columns, archived_at))
+        db.execute(delete(hot).where(hot.c.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+    return moved
\ No newline at end of file
@@ -0,0 +1,93 @@
+# app/crud/data_import.py
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..models.data_import import DataImport
+import datetime
+import hashlib
+from typing import Optional, Tuple
+
+# A PENDING claim older than this is treated as abandoned (worker died mid-import)
+STALE_CLAIM_SECONDS = 30 * 60
+
+def file_checksum(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def get_import_by_checksum(db: Session, checksum: str) -> Optional[DataImport]:
+    return db.query(DataImport).filter(DataImport.file_sha256 == checksum).first()
+
+def claim_import(db: Session, checksum: str, filename: str) -> Tuple[Optional[DataImport], Optional[DataImport]]:
+    """
+    Claims a file for importing before any row is written, so concurrent
+    uploads of the same file (e.g. a retry after a timeout) don't both import it.
+
+    Returns (claimed entry, None) when this caller may import, or
+    (None, existing entry) when the file is COMPLETED or another upload holds
+    a fresh PENDING claim. The unique file_sha256 makes the first claim atomic;
+    taking over a PARTIAL/FAILED/stale entry is a compare-and-set on its status.
+    """
+    now = datetime.datetime.utcnow()
+    db_import = DataImport(
+        file_sha256=checksum, filename=filename, status="PENDING",
+        created_at=now, updated_at=now, imported_count=0,
+    )
+    db.add(db_import)
+    try:
+        db.commit()
+        return db_import, None
+    except IntegrityError:
+        db.rollback()
+
+    existing = get_import_by_checksum(db, checksum)
+    if existing is None:
+        # Removed in between; let the caller retry as a fresh upload
+        return claim_import(db, checksum, filename)
+    stale = existing.updated_at < now - datetime.timedelta(seconds=STALE_CLAIM_SECONDS)
+    if existing.status == "COMPLETED" or (existing.status == "PENDING" and not stale):
+        return None, existing
+
+    taken = db.execute(
+        update(DataImport)
+        .where(DataImport.id == existing.id,
+               DataImport.status == existing.status,
+               DataImport.updated_at == existing.updated_at)
+        .values(status="PENDING", filename=filename, updated_at=now)
+    ).rowcount
+    db.commit()
+    if not taken:
+        return None, get_import_by_checksum(db, checksum)
+    db.refresh(existing)
+    return existing, None
+
+def release_import(db: Session, db_import: DataImport):
+    """Marks a claimed import as FAILED (it can be retried)."""
+    db.rollback()
+    db_import.status = "FAILED"
+    db_import.updated_at = datetime.datetime.utcnow()
+    db.commit()
+
+def record_import(
+    db: Session,
+    checksum: str,
+    filename: str,
+    row_count: int,
+    imported_count: int,
+    duplicate_count: int,
+    error_count: int,
+) -> DataImport:
+    """Completes the (claimed) import log entry for a file and commits it."""
+    now = datetime.datetime.utcnow()
+    db_import = get_import_by_checksum(db, checksum)
+    if db_import is None:
+        db_import = DataImport(file_sha256=checksum, created_at=now, imported_count=0)
+        db.add(db_import)
+    db_import.filename = filename
+    db_import.row_count = row_count
+    db_import.imported_count = (db_import.imported_count or 0) + imported_count
+    db_import.duplicate_count = duplicate_count
+    db_import.error_count = error_count
+    db_import.status = "PARTIAL" if error_count else "COMPLETED"
+    db_import.updated_at = now
+    db.commit()
+    return db_import
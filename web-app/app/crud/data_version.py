@@ -0,0 +1,29 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from ..models.data_version import DataVersion
+
+def bump(db: Session, name: str):
+    """
+    Increments the named change counter in the caller's transaction (the caller
+    commits). Call it wherever existing rows change in a way the cheap markers
+    (row count, highest id) can't see: updates and deletes, not inserts.
+    """
+    table = DataVersion.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(name=name, version=1)
+        db.execute(stmt.on_conflict_do_update(index_elements=[table.c.name],
+                                              set_={"version": table.c.version + 1}))
+        return
+
+    result = db.execute(update(table).where(table.c.name == name).values(version=table.c.version + 1))
+    if result.rowcount == 0:
+        db.execute(insert(table).values(name=name, version=1))
+
+def get_version_query(name: str):
+    """Scalar subquery of the named counter (NULL until the first bump)."""
+    return select(DataVersion.version).where(DataVersion.name == name).scalar_subquery()
@@ -0,0 +1,60 @@
+"""
+Moves old invitation log rows into email_invitation_logs_archive.
+
+Run from the web-app directory (e.g. from cron):
+
+    python -m app.jobs.archive_email_logs --days 90
+
+Defaults to EMAIL_LOG_RETENTION_DAYS. Rows are moved in batches, each in its
+own transaction, so the job can run while the app is serving traffic. Only one
+archiver runs at a time (the "email-log-archive" lock): a worker or cron run
+that finds it taken leaves the work to the one holding it.
+"""
+import argparse
+import datetime
+import logging
+import sys
+
+from ..core import config
+from ..core.database import SessionLocal, engine
+from ..core.locks import advisory_lock
+from ..crud import data_entry_email
+from ..models.data_entry_email import EmailLogArchive
+
+logger = logging.getLogger(__name__)
+
+
+def run(days: int, batch_size: int = data_entry_email.ARCHIVE_BATCH_SIZE) -> int:
+    """Archives rows older than `days` days. Returns the number of rows moved."""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    with advisory_lock(engine, "email-log-archive", blocking=False) as acquired:
+        if not acquired:
+            logger.info("Another process is archiving invitation logs; skipping")
+            return 0
+        with SessionLocal() as db:
+            moved = data_entry_email.archive_email_logs(db, cutoff, batch_size=batch_size)
+    if moved:
+        logger.info("Archived %s invitation log rows sent before %s", moved, cutoff.isoformat())
+    return moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old invitation log rows.")
+    parser.add_argument("--days", type=int, default=config.EMAIL_LOG_RETENTION_DAYS,
+                        help="Keep this many days in the hot table (default: EMAIL_LOG_RETENTION_DAYS).")
+    parser.add_argument("--batch-size", type=int, default=data_entry_email.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    if args.days <= 0:
+        parser.error("--days must be positive (or set EMAIL_LOG_RETENTION_DAYS)")
+
+    # The archive table is new; create it if the app hasn't started since
+    # (on an existing table, the unique log_id index comes from app.jobs.migrate)
+    EmailLogArchive.__table__.create(bind=engine, checkfirst=True)
+
+    moved = run(args.days, args.batch_size)
+    print(f"Archived {moved} invitation log rows older than {args.days} days.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
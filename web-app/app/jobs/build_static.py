@@ -0,0 +1,116 @@
+"""
+Vendors the third-party assets and precompresses everything under static/.
+
+Run from the web-app directory, as a deploy/image build step:
+
+    python -m app.jobs.build_static --download
+
+--download fetches the pinned versions in static_assets.VENDOR_ASSETS into
+static/vendor/ (checked against their SRI hash where one is known; existing
+files are kept unless --force). Run it wherever the CDNs are reachable and
+ship or commit static/vendor/, so restricted networks never need them. The
+build fails while any vendor asset is missing; the deploy workflow runs this
+job before restarting the service.
+
+Every compressible file then gets .gz (and .br, if the optional `brotli`
+package is installed) siblings, which PrecompressedStaticFiles serves to
+clients that accept them. Variants that wouldn't be smaller are not written.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import logging
+import sys
+from pathlib import Path
+
+from ..core import static_assets
+
+logger = logging.getLogger(__name__)
+
+
+def _check_integrity(content: bytes, integrity: str):
+    algorithm, _, expected = integrity.partition("-")
+    actual = base64.b64encode(hashlib.new(algorithm, content).digest()).decode()
+    if actual != expected:
+        raise ValueError(f"integrity mismatch: expected {integrity}, got {algorithm}-{actual}")
+
+
+def download(force: bool = False, timeout: float = 30.0) -> int:
+    """Fetches the vendor assets. Returns the number of files written."""
+    import requests
+
+    written = 0
+    for relative, (url, integrity) in static_assets.VENDOR_ASSETS.items():
+        target = static_assets.STATIC_DIR / static_assets.VENDOR_DIR / relative
+        if target.exists() and not force:
+            continue
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        if integrity:
+            try:
+                _check_integrity(response.content, integrity)
+            except ValueError as e:
+                raise ValueError(f"{url}: {e}") from None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(response.content)
+        written += 1
+        logger.info("Vendored %s (%s bytes)", url, len(response.content))
+    return written
+
+
+def precompress(static_dir: Path = None) -> dict:
+    """Writes .gz/.br variants. Returns {"files", "bytes", "gzip_bytes", "brotli_bytes"}."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    static_dir = static_dir or static_assets.STATIC_DIR
+    totals = {"files": 0, "bytes": 0, "gzip_bytes": 0, "brotli_bytes": 0}
+    for path in sorted(static_dir.rglob("*")):
+        if (not path.is_file() or static_assets.is_precompressed_variant(path)
+                or path.suffix not in static_assets.COMPRESSIBLE_SUFFIXES):
+            continue
+        content = path.read_bytes()
+        totals["files"] += 1
+        totals["bytes"] += len(content)
+
+        variants = {".gz": ("gzip_bytes", gzip.compress(content, compresslevel=9, mtime=0))}
+        if brotli is not None:
+            variants[".br"] = ("brotli_bytes", brotli.compress(content, quality=11))
+        for suffix, (key, compressed) in variants.items():
+            target = path.with_name(path.name + suffix)
+            if len(compressed) >= len(content):
+                target.unlink(missing_ok=True)
+                totals[key] += len(content)
+                continue
+            target.write_bytes(compressed)
+            totals[key] += len(compressed)
+    if brotli is None:
+        logger.warning("brotli is not installed; only gzip variants were written")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vendor and precompress the static assets.")
+    parser.add_argument("--download", action="store_true", help="Fetch missing vendor assets from their CDNs.")
+    parser.add_argument("--force", action="store_true", help="Re-download vendor assets that already exist.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.download:
+        print(f"Downloaded {download(force=args.force)} vendor asset(s).")
+    totals = precompress()
+    print(f"Precompressed {totals['files']} file(s): {totals['bytes']} bytes -> "
+          f"gzip {totals['gzip_bytes']}, brotli {totals['brotli_bytes'] or 'n/a'}")
+
+    missing = static_assets.missing_vendor_assets()
+    if missing:
+        print(f"Missing vendor assets (pages will link the CDN): {', '.join(missing)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
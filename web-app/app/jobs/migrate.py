@@ -0,0 +1,26 @@
+"""
+Applies the additive schema upgrades once, outside the app.
+
+Run from the web-app directory as a deploy step, with CREATE_SCHEMA_ON_STARTUP
+off so workers don't touch DDL at boot:
+
+    python -m app.jobs.migrate
+"""
+import logging
+import sys
+
+from ..core import migrations
+from ..core.database import engine
+# Register every model before create_all
+from ..models import item, student, data_entry_email, data_import, feature_histogram, data_version  # noqa: F401
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    migrations.ensure_schema(engine)
+    print("Schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
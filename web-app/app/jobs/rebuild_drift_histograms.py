@@ -0,0 +1,31 @@
+"""
+Rebuilds the live feature histograms used for drift monitoring from the
+stored records, replacing whatever counts are there.
+
+Run from the web-app directory, e.g. after turning DRIFT_ENABLED on for a
+database that already has records, or after editing records directly:
+
+    python -m app.jobs.rebuild_drift_histograms
+
+Workers do the same at startup when the counts don't add up to the number of
+records (crud_drift.initialize_histograms); this forces it.
+"""
+import logging
+import sys
+
+from ..core.database import SessionLocal
+from ..core.locks import advisory_lock
+from ..crud import crud_drift
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with SessionLocal() as db:
+        with advisory_lock(db.get_bind(), "feature_histograms"):
+            counted = crud_drift.rebuild_histograms(db)
+    print(f"Rebuilt the drift histograms from {counted} record(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,22 +1,91 @@
+from contextlib import asynccontextmanager
+import threading
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from .core.database import engine, Base
+from .core import config, ml_artifacts, metrics, profiling, migrations, shadow, static_assets, templating
+from .core.static_assets import PrecompressedStaticFiles
+from .core.database import engine, Base, SessionLocal
 from .models import item as item_model  # Import models to register them
 from .models import student as student_model  # Import models to register them
 from .models import data_entry_email as data_entry_email_model  # Import models to register them
+from .models import data_import as data_import_model  # Import models to register them
+from .models import feature_histogram as feature_histogram_model  # Import models to register them
+from .models import data_version as data_version_model  # Import models to register them
 
-# Initialize database tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="FastAPI Modular App")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize database tables and additive upgrades (optional, see CREATE_SCHEMA_ON_STARTUP)
+    if config.CREATE_SCHEMA_ON_STARTUP:
+        migrations.ensure_schema(engine)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+    # Build (or backfill) the live feature histograms used for drift monitoring;
+    # one worker rebuilds them under a lock if they don't match the records
+    if config.DRIFT_ENABLED:
+        from .crud import crud_drift
+        with SessionLocal() as db:
+            crud_drift.initialize_histograms(db)
 
-# Configure Jinja2 templates (Template configuration remains here)
-templates = Jinja2Templates(directory="templates")
+    # Canary split / model generation shared with the other workers (see core.shadow)
+    shadow.sync(reload=False)
+
+    # Load ML artifacts outside of import time
+    if config.ML_WARMUP == "eager":
+        ml_artifacts.load_artifacts()
+    elif config.ML_WARMUP == "background":
+        ml_artifacts.start_background_warmup()
+    # "lazy": the first /predict request loads them
+
+    # Invitation log retention (the job can also run from cron, see app.jobs.archive_email_logs).
+    # Every worker starts the thread, but only the one that gets the archive lock moves rows.
+    if config.EMAIL_LOG_RETENTION_DAYS > 0:
+        from .jobs import archive_email_logs
+        threading.Thread(
+            target=archive_email_logs.run, args=(config.EMAIL_LOG_RETENTION_DAYS,),
+            name="email-log-archive", daemon=True,
+        ).start()
+
+    # Candidate model for shadow / canary evaluation (only if one was dropped in)
+    if config.SHADOW_ENABLED:
+        if config.ML_WARMUP == "eager":
+            shadow.load_candidate()
+        else:
+            threading.Thread(target=shadow.load_candidate, name="shadow-candidate-load", daemon=True).start()
+
+    # Compile the page templates now (or load them from the bytecode cache)
+    if config.TEMPLATE_PRECOMPILE:
+        templating.precompile()
+
+    yield
+
+    # Commit submissions still waiting in the group-commit queue
+    if config.GROUP_COMMIT_ENABLED:
+        from .core import write_buffer
+        write_buffer.WRITER.stop()
+
+
+app = FastAPI(title="FastAPI Modular App", lifespan=lifespan)
+
+# Request timing, per-request SQL counters and the /metrics endpoint
+if config.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Opt-in request profiler; costs nothing when disabled because it isn't installed.
+# It refuses to run without PROFILING_TOKEN (traces contain SQL and stacks).
+PROFILING_ACTIVE = profiling.is_configured()
+if PROFILING_ACTIVE:
+    profiling.instrument_engine(engine)
+    profiling.instrument_threadpool()
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Mount static files (fingerprinted names, precompressed variants, see core.static_assets);
+# warns about third-party assets that aren't vendored yet (see VENDOR_CDN_FALLBACK)
+static_assets.check_vendor_assets()
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+# Jinja2 templates are configured in core.templating and shared by the routers
+templates = templating.templates
 
 # --- Include Routers ---
 from .api.routers import ui, ml_apis
@@ -25,6 +94,17 @@ app.include_router(ui.router)
 app.include_router(ml_apis.router)
 
 # If you add API endpoints, include them like this:
-from .api.routers import item, student
+from .api.routers import item, student, drift, models, analytics
 app.include_router(student.router, prefix="/api/v1")
-app.include_router(item.router, prefix="/api/v1", tags=["items"])
\ No newline at end of file
+app.include_router(drift.router, prefix="/api/v1")
+app.include_router(models.router, prefix="/api/v1")
+app.include_router(analytics.router, prefix="/api/v1")
+app.include_router(item.router, prefix="/api/v1", tags=["items"])
+
+if config.METRICS_ENABLED:
+    from .api.routers import metrics as metrics_router
+    app.include_router(metrics_router.router)
+
+if PROFILING_ACTIVE:
+    from .api.routers import profiling as profiling_router
+    app.include_router(profiling_router.router)
\ No newline at end of file
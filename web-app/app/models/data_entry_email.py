@@ -1,13 +1,40 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from ..core.database import Base
 import datetime
 
 class EmailLog(Base):
     """Model for storing the history of invitation emails sent."""
     __tablename__ = "email_invitation_logs"
+    __table_args__ = (
+        # Keyset pagination (newest first). On PostgreSQL the remaining columns are
+        # INCLUDEd so a page is an index-only scan.
+        Index(
+            "ix_email_invitation_logs_send_time_id", "send_time", "id",
+            postgresql_include=["recipient_email", "status", "form_link"],
+        ),
+        # Same order within one status / one recipient (the log view's filters)
+        Index("ix_email_invitation_logs_status_send_time_id", "status", "send_time", "id"),
+        Index("ix_email_invitation_logs_recipient_send_time_id", "recipient_email", "send_time", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     recipient_email = Column(String, index=True, nullable=False)
     send_time = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     status = Column(String, default="SENT", nullable=False) # SENT or FAILED
-    form_link = Column(String, nullable=False)
\ No newline at end of file
+    form_link = Column(String, nullable=False)
+
+class EmailLogArchive(Base):
+    """Log rows moved out of email_invitation_logs by the retention job."""
+    __tablename__ = "email_invitation_logs_archive"
+    __table_args__ = (
+        # A log row is archived at most once, however many archivers overlap
+        Index("uq_email_invitation_logs_archive_log_id", "log_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    log_id = Column(Integer, nullable=False)  # id the row had in email_invitation_logs
+    recipient_email = Column(String, index=True, nullable=False)
+    send_time = Column(DateTime, index=True, nullable=False)
+    status = Column(String, nullable=False)
+    form_link = Column(String, nullable=False)
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from ..core.database import Base
+import datetime
+
+class DataImport(Base):
+    """One row per uploaded CSV file, identified by its checksum (idempotent re-imports)."""
+    __tablename__ = "data_imports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    filename = Column(String, nullable=True)
+    row_count = Column(Integer, default=0, nullable=False)
+    imported_count = Column(Integer, default=0, nullable=False)
+    duplicate_count = Column(Integer, default=0, nullable=False)
+    error_count = Column(Integer, default=0, nullable=False)
+    status = Column(String, default="COMPLETED", nullable=False) # PENDING, COMPLETED, PARTIAL or FAILED
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
\ No newline at end of file
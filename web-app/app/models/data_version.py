@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from ..core.database import Base
+
+class DataVersion(Base):
+    """Change counters shared by all workers, e.g. bumped when stored student rows are edited or deleted."""
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
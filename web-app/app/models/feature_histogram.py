@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from ..core.database import Base
+
+class FeatureHistogram(Base):
+    """Running value counts of each model feature over all stored student records."""
+    __tablename__ = "feature_histograms"
+    __table_args__ = (UniqueConstraint("feature", "value", name="uq_feature_histograms_feature_value"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    feature = Column(String, nullable=False)
+    value = Column(String, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
\ No newline at end of file
@@ -28,6 +28,11 @@ class StudentData(Base):
 
     # Target Variable
     Grade = Column(String, index=True) # e.g., 'AA', 'A', 'B', etc.
+
+    # SHA-256 of the normalized field values, used to report records with identical
+    # content. Advisory only: the index is not unique, different students can give
+    # identical answers, and concurrent imports may both insert the same content.
+    Record_Hash = Column(String(64), index=True, nullable=True)
     
     def __repr__(self):
         return f"<Student(ID={self.Student_ID}, Grade={self.Grade})>"
\ No newline at end of file
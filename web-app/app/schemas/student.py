@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Optional
 
 # List of all columns for the API/UI interaction
 class StudentDataCreate(BaseModel):
@@ -20,7 +20,32 @@ class StudentDataCreate(BaseModel):
     Project_work: str
     Grade: Optional[str] = None 
 
+# Validates a whole batch in one call (bulk ingest API)
+StudentDataCreateList = TypeAdapter(List[StudentDataCreate])
+
 # Used when reading data from the database (output)
 class StudentDataInDB(StudentDataCreate):
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Allowed values of the categorical fields (mirrors data_preparation/dataset.py CHOICES)
+STUDENT_FIELD_CHOICES = {
+    'Sex': ['Male', 'Female'],
+    'High_School_Type': ['State', 'Private', 'Other'],
+    'Scholarship': [0, 25, 50, 75, 100],
+    'Additional_Work': ['Yes', 'No'],
+    'Sports_activity': ['Yes', 'No'],
+    'Transportation': ['Private', 'Bus', 'Other'],
+    'Attendance': ['Always', 'Sometimes', 'Never'],
+    'Reading': ['Yes', 'No'],
+    'Notes': ['Yes', 'No'],
+    'Listening_in_Class': ['Yes', 'No'],
+    'Project_work': ['Yes', 'No'],
+    'Grade': ['A', 'B', 'C', 'D', 'E', 'Fail'],
+}
+
+# Allowed ranges of the discrete numeric fields (dataset.py: np.arange(18, 25), np.arange(0, 11))
+STUDENT_FIELD_RANGES = {
+    'Student_Age': (18, 24),
+    'Weekly_Study_Hours': (0, 10),
+}
\ No newline at end of file
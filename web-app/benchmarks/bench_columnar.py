@@ -0,0 +1,99 @@
+"""
+Columnar snapshot vs. SQL for the analytics queries.
+
+Run from the web-app directory:
+
+    python -m benchmarks.bench_columnar --rows 1000000 --output columnar.json
+
+Seeds a throwaway database (or --database-url, which is dropped and re-seeded),
+then reports the snapshot's load time and memory per million rows, the cost of
+an incremental refresh, and median/p95 latency of each query through SQL and
+through the NumPy arrays.
+"""
+import argparse
+import json
+import sys
+
+from . import fixtures
+from .run import summarize, timed
+
+QUERIES = {
+    "data_quality_metrics": lambda crud, db: crud.calculate_data_quality_metrics(db),
+    "group_by_attendance_x_grade": lambda crud, db: crud.group_counts(db, "Attendance", "Grade"),
+    "group_by_age_x_sex": lambda crud, db: crud.group_counts(db, "Student_Age", "Sex"),
+}
+
+
+def run(rows: int, iterations: int, database_url: str = None) -> dict:
+    fixtures.configure_environment(database_url)
+    fixtures.reset_database()
+    fixtures.seed_students(rows)
+
+    import time
+    from app.core import columnar, config
+    from app.core.database import SessionLocal
+    from app.crud import crud_student
+
+    result = {"rows": rows, "iterations": iterations, "queries": {}}
+    with SessionLocal() as db:
+        snapshot = columnar.ColumnarSnapshot()
+        started = time.perf_counter()
+        snapshot.refresh(db)
+        result["initial_load_seconds"] = time.perf_counter() - started
+        columnar.SNAPSHOT = snapshot
+
+        # Refresh with nothing new (what every analytics request pays) and with new rows
+        result["refresh_noop"] = summarize(timed(lambda: snapshot.refresh(db), iterations))
+        fixtures.seed_students(1_000, seed=7)
+        started = time.perf_counter()
+        added = snapshot.refresh(db)
+        result["refresh_1000_new_rows_seconds"] = time.perf_counter() - started
+        assert added == 1_000, added
+        result["snapshot"] = snapshot.stats()
+
+        for name, query in QUERIES.items():
+            config.COLUMNAR_CACHE_ENABLED = False
+            sql = summarize(timed(lambda: query(crud_student, db), iterations))
+            expected = query(crud_student, db)
+            config.COLUMNAR_CACHE_ENABLED = True
+            vectorized = summarize(timed(lambda: query(crud_student, db), iterations))
+            actual = query(crud_student, db)
+            if name == "data_quality_metrics":
+                # Ties in the age ordering may come back in a different order
+                expected["age_distribution"] = sorted(expected["age_distribution"])
+                actual["age_distribution"] = sorted(actual["age_distribution"])
+            result["queries"][name] = {
+                "sql": sql,
+                "columnar": vectorized,
+                "speedup": sql["median"] / vectorized["median"],
+                "same_result": expected == actual,
+            }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the columnar analytics snapshot against SQL.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--database-url", default=None, help="Defaults to a throwaway SQLite file.")
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.iterations, args.database_url)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    for name, query in result["queries"].items():
+        print(f"{name}: sql {query['sql']['median'] * 1000:.2f} ms, "
+              f"columnar {query['columnar']['median'] * 1000:.2f} ms "
+              f"({query['speedup']:.0f}x, same result: {query['same_result']})", file=sys.stderr)
+    print(f"snapshot: {result['snapshot']['mb_per_million_rows']} MB per million rows, "
+          f"initial load {result['initial_load_seconds']:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
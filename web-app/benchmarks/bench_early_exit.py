@@ -0,0 +1,104 @@
+"""
+Early-exit vs. full-forest inference for single predictions.
+
+Run from the web-app directory:
+
+    python -m benchmarks.bench_early_exit --tolerances 0,0.02,0.05 --output early_exit.json
+
+Scores every row of the realistic dataset one at a time, the way /predict does,
+and reports the average number of trees evaluated, agreement with the full
+forest's grade, the confidence difference and the median latency of both paths.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from . import fixtures
+
+DATASET = fixtures.DATA_PREPARATION_DIR / "DataSets" / "student_performance_realistic_200.csv"
+
+
+def _latency(func, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def run(tolerances, repeats: int) -> dict:
+    fixtures.configure_environment()
+    import pandas as pd
+    from app.core import ml_artifacts
+    from app.core.early_exit import EarlyExitForest
+
+    ml_artifacts.load_artifacts()
+    pipeline = ml_artifacts.ML_PIPELINE
+    started = time.perf_counter()
+    forest = EarlyExitForest.from_pipeline(pipeline, ml_artifacts.ML_FEATURE_REFERENCE)
+    build_seconds = time.perf_counter() - started
+
+    data = pd.read_csv(DATASET).drop(columns=["Grade"])
+    rows = [data.iloc[[i]] for i in range(len(data))]
+
+    # Today's /predict path: predict() then predict_proba()
+    full = []
+    full_latency = []
+    for row in rows:
+        full.append((pipeline.predict(row)[0], float(pipeline.predict_proba(row).max())))
+        full_latency.append(_latency(lambda: (pipeline.predict(row), pipeline.predict_proba(row)), repeats))
+
+    result = {
+        "rows": len(rows),
+        "trees": len(forest.order),
+        "order_build_seconds": build_seconds,
+        "full_median_ms": statistics.median(full_latency) * 1000,
+        "modes": {},
+    }
+    for tolerance in tolerances:
+        trees, same, confidence_diff, latency = [], 0, [], []
+        for row, (grade, confidence) in zip(rows, full):
+            predicted, estimate, evaluated = forest.predict_one(row, tolerance=tolerance)
+            trees.append(evaluated)
+            same += predicted == grade
+            confidence_diff.append(abs(estimate - confidence))
+            latency.append(_latency(lambda: forest.predict_one(row, tolerance=tolerance), repeats))
+        median_ms = statistics.median(latency) * 1000
+        result["modes"][str(tolerance)] = {
+            "mean_trees": statistics.fmean(trees),
+            "median_trees": statistics.median(trees),
+            "grade_agreement": same / len(rows),
+            "mean_abs_confidence_diff": statistics.fmean(confidence_diff),
+            "median_ms": median_ms,
+            "speedup": result["full_median_ms"] / median_ms,
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark early-exit forest inference.")
+    parser.add_argument("--tolerances", type=lambda v: [float(x) for x in v.split(",")], default=[0.0, 0.02, 0.05])
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repeats per row.")
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    result = run(args.tolerances, args.repeats)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    print(f"full forest: {result['full_median_ms']:.2f} ms ({result['trees']} trees)", file=sys.stderr)
+    for tolerance, mode in result["modes"].items():
+        print(f"tolerance {tolerance}: {mode['mean_trees']:.1f} trees on average, {mode['median_ms']:.2f} ms "
+              f"({mode['speedup']:.1f}x), same grade {mode['grade_agreement']:.1%}, "
+              f"confidence diff {mode['mean_abs_confidence_diff']:.3f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Sustained single-record submissions per second with and without group commit.
+
+Run from the web-app directory:
+
+    python -m benchmarks.bench_group_commit --concurrency 1 16 64 --seconds 5 --output group_commit.json
+
+Each concurrency level runs that many client threads for --seconds, each
+submitting validated records back to back, the way concurrent form posts reach
+the database:
+  - per_record:   own session, crud_student.create_student_record() (commit per row)
+  - group_commit: write_buffer's GroupCommitWriter, waiting until the row is committed
+Reports submissions/s, p50/p95 latency, the mean group size, and checks that
+every acknowledged submission is in the table.
+
+(Through the HTTP form handler in a single process the per-record path is worse
+than shown here: it runs synchronously on the event loop, and beyond ~15
+concurrent submissions it waits for pool connections that only the blocked loop
+could release, stalling for the pool timeout.)
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from . import fixtures
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else None
+
+
+def _drive(submit, records, concurrency: int, seconds: float) -> dict:
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    deadline = time.perf_counter() + seconds
+
+    def client(slot):
+        index = slot
+        while time.perf_counter() < deadline:
+            record = records[index % len(records)]
+            index += concurrency
+            started = time.perf_counter()
+            try:
+                submit(record)
+            except Exception:
+                errors[slot] += 1
+                continue
+            latencies[slot].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    done = [latency for per_client in latencies for latency in per_client]
+    return {
+        "submissions": len(done),
+        "errors": sum(errors),
+        "submissions_per_second": len(done) / elapsed,
+        "p50_ms": _percentile(done, 0.50) * 1000 if done else None,
+        "p95_ms": _percentile(done, 0.95) * 1000 if done else None,
+    }
+
+
+def run(concurrency_levels, seconds: float, database_url: str = None,
+        max_size: int = None, max_wait_ms: float = None) -> dict:
+    fixtures.configure_environment(database_url)
+    fixtures.reset_database()
+
+    from app.core import write_buffer
+    from app.core.database import SessionLocal
+    from app.crud import crud_student
+    from app.models.student import StudentData
+    from app.schemas.student import StudentDataCreate
+
+    records = [StudentDataCreate(**record)
+               for record in fixtures.generate_students(2_000, seed=21).to_dict("records")]
+
+    def per_record(record):
+        with SessionLocal() as db:
+            crud_student.create_student_record(db=db, record=record)
+
+    result = {"seconds": seconds, "levels": {}}
+    for concurrency in concurrency_levels:
+        level = {}
+        writer = write_buffer.GroupCommitWriter(max_size, max_wait_ms)
+        modes = {
+            "per_record": per_record,
+            "group_commit": lambda record: writer.submit(record).result(),
+        }
+        for mode, submit in modes.items():
+            with SessionLocal() as db:
+                before = db.query(StudentData).count()
+            level[mode] = _drive(submit, records, concurrency, seconds)
+            with SessionLocal() as db:
+                # Every acknowledged submission must already be in the table
+                level[mode]["rows_written"] = db.query(StudentData).count() - before
+        writer.stop()
+        level["group_commit"]["writer"] = writer.stats()
+        baseline = level["per_record"]["submissions_per_second"]
+        level["speedup"] = level["group_commit"]["submissions_per_second"] / baseline if baseline else None
+        result["levels"][str(concurrency)] = level
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark group commit for single-record submissions.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-size", type=int, default=None, help="Defaults to GROUP_COMMIT_MAX_SIZE.")
+    parser.add_argument("--max-wait-ms", type=float, default=None, help="Defaults to GROUP_COMMIT_MAX_WAIT_MS.")
+    parser.add_argument("--database-url", default=None, help="Defaults to a throwaway SQLite file.")
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    result = run(args.concurrency, args.seconds, args.database_url, args.max_size, args.max_wait_ms)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    for concurrency, level in result["levels"].items():
+        per_record, grouped = level["per_record"], level["group_commit"]
+        print(f"{concurrency:>4} clients: per-record {per_record['submissions_per_second']:.0f}/s "
+              f"(p95 {per_record['p95_ms']:.1f} ms), group commit {grouped['submissions_per_second']:.0f}/s "
+              f"(p95 {grouped['p95_ms']:.1f} ms, mean group {grouped['writer']['mean_group_size']}) "
+              f"-> {level['speedup'] or 0:.1f}x", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
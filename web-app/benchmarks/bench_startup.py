@@ -0,0 +1,161 @@
+"""
+Cold-start benchmark: import time of app.main and time-to-first-request.
+
+Run from the web-app directory:
+
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+
+Every measurement runs in a fresh interpreter so nothing is cached between runs.
+Pass --max-import-seconds / --max-first-request-seconds to make the script exit
+with status 1 when a threshold is exceeded (useful in CI).
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+WEB_APP_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_PROBE = (
+    "import time, sys\n"
+    "t0 = time.perf_counter()\n"
+    "import app.main\n"
+    "elapsed = time.perf_counter() - t0\n"
+    "heavy = [m for m in ('pandas', 'numpy', 'sklearn', 'joblib', 'requests') if m in sys.modules]\n"
+    "print(elapsed)\n"
+    "print(','.join(heavy))\n"
+)
+
+PREDICT_FORM = {
+    'Student_Age': '20', 'Sex': 'Male', 'High_School_Type': 'State', 'Scholarship': '50',
+    'Additional_Work': 'No', 'Sports_activity': 'No', 'Transportation': 'Bus',
+    'Weekly_Study_Hours': '5', 'Attendance': 'Always', 'Reading': 'Yes', 'Notes': 'Yes',
+    'Listening_in_Class': 'Yes', 'Project_work': 'No',
+}
+
+
+def _env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", database_url)
+    # Same as benchmarks.fixtures: a checkout without static/vendor/ must still start
+    env.setdefault("VENDOR_CDN_FALLBACK", "1")
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=WEB_APP_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    return {"seconds": float(out[0]), "heavy_modules": [m for m in out[1].split(",") if m] if len(out) > 1 else []}
+
+
+def _wait_for(url: str, deadline: float, data: bytes = None) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, data=data, timeout=5) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.01)
+    raise TimeoutError(f"No successful response from {url}")
+
+
+def measure_first_request(env: dict, timeout: float) -> dict:
+    """Starts uvicorn and times the first page and the first prediction."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=WEB_APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = t0 + timeout
+        first_page = _wait_for(f"{base}/visuals", deadline)
+        form = urllib.parse.urlencode(PREDICT_FORM).encode()
+        first_prediction = _wait_for(f"{base}/predict", deadline, data=form)
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "first_request_seconds": first_page - t0,
+        "first_prediction_seconds": first_prediction - t0,
+    }
+
+
+def summarize(values):
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "max": max(values),
+    }
+
+
+def run(runs: int = 3, timeout: float = 60.0, database_url: str = None) -> dict:
+    tmp_dir = tempfile.mkdtemp(prefix="spa-bench-")
+    env = _env(database_url or f"sqlite:///{tmp_dir}/startup.db")
+
+    imports = [measure_import(env) for _ in range(runs)]
+    first = [measure_first_request(env, timeout) for _ in range(runs)]
+
+    return {
+        "benchmark": "startup",
+        "runs": runs,
+        "ml_warmup": env.get("ML_WARMUP", "background"),
+        "import_seconds": summarize([r["seconds"] for r in imports]),
+        "heavy_modules_at_import": imports[-1]["heavy_modules"],
+        "first_request_seconds": summarize([r["first_request_seconds"] for r in first]),
+        "first_prediction_seconds": summarize([r["first_prediction_seconds"] for r in first]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--database-url", default=None, help="Defaults to a throwaway SQLite file.")
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout.")
+    parser.add_argument("--max-import-seconds", type=float, default=None)
+    parser.add_argument("--max-first-request-seconds", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    result = run(args.runs, args.timeout, args.database_url)
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload)
+    else:
+        print(payload)
+
+    failures = []
+    if args.max_import_seconds is not None and result["import_seconds"]["median"] > args.max_import_seconds:
+        failures.append(f"import time {result['import_seconds']['median']:.3f}s > {args.max_import_seconds}s")
+    if (args.max_first_request_seconds is not None
+            and result["first_request_seconds"]["median"] > args.max_first_request_seconds):
+        failures.append(
+            f"time to first request {result['first_request_seconds']['median']:.3f}s > {args.max_first_request_seconds}s"
+        )
+    if result["heavy_modules_at_import"]:
+        failures.append(f"heavy modules imported eagerly: {result['heavy_modules_at_import']}")
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
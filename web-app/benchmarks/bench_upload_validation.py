@@ -0,0 +1,88 @@
+"""
+Throughput of the dry-run CSV validation.
+
+Run from the web-app directory:
+
+    python -m benchmarks.bench_upload_validation --rows 1000000 --output validation.json
+
+Generates a students CSV with a sprinkling of bad values, then times
+upload_validation.validate_csv() directly and through
+POST /api/v1/student-data/validate, and reports MB/s and rows/s.
+"""
+import argparse
+import json
+import sys
+import time
+
+from . import fixtures
+
+# (column, bad value) patterns written into every BAD_ROW_EVERY-th row
+BAD_VALUES = (("Student_Age", "abc"), ("Sex", "M"), ("Scholarship", "33"), ("Weekly_Study_Hours", ""))
+BAD_ROW_EVERY = 1000
+
+
+def make_csv(rows: int) -> bytes:
+    frame = fixtures.generate_students(rows, seed=11).astype(str)
+    for offset, (column, value) in enumerate(BAD_VALUES):
+        frame.loc[frame.index[offset::BAD_ROW_EVERY], column] = value
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+def run(rows: int, repeats: int) -> dict:
+    fixtures.configure_environment()
+    from fastapi.testclient import TestClient
+    from app.core import upload_validation
+
+    content = make_csv(rows)
+    megabytes = len(content) / 2**20
+
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        report = upload_validation.validate_csv(content)
+        samples.append(time.perf_counter() - started)
+    best = min(samples)
+
+    fixtures.reset_database()
+    from app.main import app
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        response = client.post("/api/v1/student-data/validate",
+                               files={"csv_file": ("bench.csv", content, "text/csv")})
+        api_seconds = time.perf_counter() - started
+        response.raise_for_status()
+
+    return {
+        "rows": rows,
+        "megabytes": round(megabytes, 2),
+        "bad_rows": report["bad_row_count"],
+        "validate_seconds": samples,
+        "mb_per_second": megabytes / best,
+        "rows_per_second": rows / best,
+        "api_seconds": api_seconds,
+        "api_mb_per_second": megabytes / api_seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dry-run CSV validation.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.repeats)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    print(f"{result['rows']} rows / {result['megabytes']} MB: {result['mb_per_second']:.1f} MB/s "
+          f"({result['rows_per_second']:,.0f} rows/s), API round trip {result['api_mb_per_second']:.1f} MB/s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
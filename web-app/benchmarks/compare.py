@@ -0,0 +1,63 @@
+"""
+Compares two benchmark result files and flags slowdowns.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.15
+
+Exits with status 1 when any case's median got slower by more than the
+threshold (a fraction: 0.15 = 15%).
+"""
+import argparse
+import json
+import sys
+
+
+def _flatten(results: dict, prefix: str = ""):
+    """Yields (case name, stats) pairs; nested cases become 'case.sub'."""
+    for name, value in results.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict) and "median" in value:
+            yield key, value
+        elif isinstance(value, dict):
+            yield from _flatten(value, key + ".")
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = "median"):
+    base = dict(_flatten(baseline["results"]))
+    rows = []
+    for name, stats in _flatten(current["results"]):
+        if name not in base:
+            continue
+        before, after = base[name][metric], stats[metric]
+        change = (after - before) / before if before else 0.0
+        rows.append({"case": name, "baseline": before, "current": after,
+                     "change": change, "regression": change > threshold})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--metric", default="median", choices=["median", "mean", "p95", "min"])
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+
+    rows = compare(baseline, current, args.threshold, args.metric)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            flag = "SLOWER" if row["regression"] else ""
+            print(f"{row['case']:<40} {row['baseline'] * 1000:>10.2f}ms {row['current'] * 1000:>10.2f}ms "
+                  f"{row['change'] * 100:>+8.1f}% {flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark fixtures: database setup, seed data and a local webhook stub.
+
+configure_environment() must run before anything under `app` is imported,
+because app.core.database reads DATABASE_URL at import time.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+
+WEB_APP_DIR = Path(__file__).resolve().parent.parent
+DATA_PREPARATION_DIR = WEB_APP_DIR.parent / "data_preparation"
+
+
+def configure_environment(database_url: str = None, webhook_url: str = None) -> str:
+    """Points the app at the benchmark database/webhook. Returns the database URL."""
+    if database_url is None:
+        tmp_dir = tempfile.mkdtemp(prefix="spa-bench-")
+        database_url = f"sqlite:///{tmp_dir}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ML_WARMUP", "eager")
+    # Server-side timings don't need the vendored CSS/JS; link the CDN if it isn't there
+    os.environ.setdefault("VENDOR_CDN_FALLBACK", "1")
+    if webhook_url:
+        os.environ["INVITE_WEBHOOK_URL"] = webhook_url
+
+    # The app resolves templates/ and static/ relative to the working directory
+    os.chdir(WEB_APP_DIR)
+    if str(WEB_APP_DIR) not in sys.path:
+        sys.path.insert(0, str(WEB_APP_DIR))
+    return database_url
+
+
+def generate_students(n_rows: int, seed: int = 42):
+    """Synthetic rows from data_preparation/dataset.py (same distributions)."""
+    if str(DATA_PREPARATION_DIR) not in sys.path:
+        sys.path.insert(0, str(DATA_PREPARATION_DIR))
+    import dataset
+
+    return dataset.generate_dataset(n_rows, seed=seed)
+
+
+def students_csv(n_rows: int, seed: int = 42) -> bytes:
+    buffer = StringIO()
+    generate_students(n_rows, seed).to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8")
+
+
+def reset_database():
+    from app.core.database import Base, engine
+    # Register every model before create_all
+    from app.models import item, student, data_entry_email, data_import, feature_histogram, data_version  # noqa: F401
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_students(n_rows: int, seed: int = 42, chunk_size: int = 10_000) -> int:
+    """Bulk-inserts n_rows generated students with Core executemany."""
+    from sqlalchemy import insert
+    from app.core.database import engine
+    from app.models.student import StudentData
+
+    from app.crud.crud_student import record_fingerprint
+
+    records = generate_students(n_rows, seed).to_dict("records")
+    for record in records:
+        record["Record_Hash"] = record_fingerprint(record)
+    with engine.begin() as conn:
+        for start in range(0, len(records), chunk_size):
+            conn.execute(insert(StudentData), records[start:start + chunk_size])
+    return len(records)
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.received += 1
+        body = json.dumps({"status": "queued"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebhookStub:
+    """Local stand-in for the n8n invitation webhook."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookHandler)
+        self.server.received = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, name="webhook-stub", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/webhook/send-data-collection-invite-email"
+
+    @property
+    def received(self) -> int:
+        return self.server.received
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
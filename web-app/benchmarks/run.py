@@ -0,0 +1,262 @@
+"""
+Benchmark suite for the application's hot paths.
+
+Run from the web-app directory (needs the packages in requirements.txt plus
+benchmarks/requirements.txt):
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --profile full --database-url postgresql://...
+    python -m benchmarks.compare baseline.json results.json
+
+The database is dropped and re-seeded from data_preparation/dataset.py, so never
+point --database-url at a database holding real data.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from . import fixtures
+
+PROFILES = {
+    # seed rows, upload sizes, iterations for request-level cases, bulk ingest sizes
+    "quick": {"seed_rows": 5_000, "upload_sizes": [1_000], "iterations": 20, "bulk_size": 2_000, "single_records": 100},
+    "full": {"seed_rows": 100_000, "upload_sizes": [1_000, 100_000, 1_000_000], "iterations": 50,
+             "bulk_size": 100_000, "single_records": 1_000},
+}
+
+PREDICT_FORM = {
+    'Student_Age': '20', 'Sex': 'Male', 'High_School_Type': 'State', 'Scholarship': '50',
+    'Additional_Work': 'No', 'Sports_activity': 'No', 'Transportation': 'Bus',
+    'Weekly_Study_Hours': '5', 'Attendance': 'Always', 'Reading': 'Yes', 'Notes': 'Yes',
+    'Listening_in_Class': 'Yes', 'Project_work': 'No',
+}
+
+
+def summarize(samples, **extra) -> dict:
+    ordered = sorted(samples)
+    p95_index = max(int(round(0.95 * len(ordered))) - 1, 0)
+    result = {
+        "n": len(ordered),
+        "min": ordered[0],
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[p95_index],
+        "max": ordered[-1],
+    }
+    result.update(extra)
+    return result
+
+
+def timed(func, iterations: int, warmup: int = 1):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _check(response, expected=(200,)):
+    if isinstance(expected, int):
+        expected = (expected,)
+    if response.status_code not in expected:
+        raise RuntimeError(f"{response.request.url} returned {response.status_code}")
+    return response
+
+
+# --- Cases ---
+def bench_predict_single(ctx):
+    client = ctx["client"]
+    return summarize(timed(lambda: _check(client.post("/predict", data=PREDICT_FORM)), ctx["iterations"]))
+
+
+def bench_predict_batch(ctx):
+    # There is no batch HTTP endpoint; this measures the model on a 1k-row frame
+    from app.core import ml_artifacts
+
+    ml_artifacts.load_artifacts()
+    frame = fixtures.generate_students(1_000, seed=7).drop(columns=["Grade"])
+    samples = timed(lambda: ml_artifacts.ML_PIPELINE.predict_proba(frame), max(ctx["iterations"] // 4, 3))
+    return summarize(samples, rows=len(frame), rows_per_second=len(frame) / statistics.median(samples))
+
+
+def bench_data_quality_metrics(ctx):
+    from app.core.database import SessionLocal
+    from app.crud import crud_student
+
+    def run_once():
+        with SessionLocal() as db:
+            crud_student.calculate_data_quality_metrics(db)
+
+    return summarize(timed(run_once, ctx["iterations"]))
+
+
+def bench_student_data_pagination(ctx):
+    client = ctx["client"]
+    results = {}
+    for label, offset in (("first", 0), ("middle", ctx["seed_rows"] // 2), ("last", max(ctx["seed_rows"] - 100, 0))):
+        url = f"/api/v1/student-data?limit=100&offset={offset}"
+        results[label] = summarize(timed(lambda: _check(client.get(url)), ctx["iterations"]))
+    return results
+
+
+def bench_data_page(ctx):
+    client = ctx["client"]
+    return summarize(timed(lambda: _check(client.get("/data")), max(ctx["iterations"] // 4, 3)))
+
+
+def bench_send_invitations(ctx):
+    client = ctx["client"]
+    emails = ", ".join(f"student{i}@example.com" for i in range(20))
+
+    def run_once():
+        _check(client.post("/send_invitations", data={"email_list": emails}, follow_redirects=False), 303)
+
+    before = ctx["webhook"].received
+    samples = timed(run_once, max(ctx["iterations"] // 4, 3), warmup=0)
+    delivered = ctx["webhook"].received - before
+    return summarize(samples, emails_per_request=20, webhook_calls=delivered)
+
+
+def bench_csv_upload(ctx):
+    client = ctx["client"]
+    results = {}
+    for size in ctx["upload_sizes"]:
+        payload = fixtures.students_csv(size, seed=size)
+        start = time.perf_counter()
+        response = client.post(
+            "/data/upload", files={"csv_file": ("bench.csv", payload, "text/csv")}, follow_redirects=False
+        )
+        elapsed = time.perf_counter() - start
+        # 303 on a clean import, 200 when duplicates/errors are reported back
+        _check(response, (200, 303))
+        results[str(size)] = summarize(
+            [elapsed], rows=size, bytes=len(payload), rows_per_second=size / elapsed
+        )
+    return results
+
+
+def bench_bulk_ingest(ctx):
+    """Records/s through the single-record form handler vs. the bulk JSON / NDJSON API."""
+    client = ctx["client"]
+    results = {}
+
+    # The HTML form handler: one request, one transaction per record
+    form_fields = {
+        'Student_Age': 'student_age', 'Sex': 'sex', 'High_School_Type': 'high_school_type',
+        'Scholarship': 'scholarship', 'Additional_Work': 'additional_work', 'Sports_activity': 'sports_activity',
+        'Transportation': 'transportation', 'Weekly_Study_Hours': 'weekly_study_hours',
+        'Attendance': 'attendance', 'Grade': 'final_grade', 'Reading': 'reading', 'Notes': 'notes',
+        'Listening_in_Class': 'listening_in_class', 'Project_work': 'project_work',
+    }
+    records = fixtures.generate_students(ctx["single_records"], seed=101).to_dict("records")
+    start = time.perf_counter()
+    for record in records:
+        form = {alias: str(record[name]) for name, alias in form_fields.items()}
+        _check(client.post("/data/add", data=form, follow_redirects=False), 303)
+    elapsed = time.perf_counter() - start
+    results["single_form"] = summarize([elapsed], records=len(records), records_per_second=len(records) / elapsed)
+
+    for label, seed, content_type in (("bulk_json", 102, "application/json"), ("bulk_ndjson", 103, "application/x-ndjson")):
+        records = fixtures.generate_students(ctx["bulk_size"], seed=seed).to_dict("records")
+        if content_type == "application/json":
+            payload = json.dumps(records)
+        else:
+            payload = "\n".join(json.dumps(record) for record in records)
+        start = time.perf_counter()
+        response = _check(client.post("/api/v1/student-data/bulk", content=payload,
+                                      headers={"Content-Type": content_type}))
+        elapsed = time.perf_counter() - start
+        body = response.json()
+        results[label] = summarize([elapsed], records=len(records), created=body["created"],
+                                   duplicates=body["duplicate"], records_per_second=len(records) / elapsed)
+    return results
+
+
+# Uploads mutate the table, so they run last
+CASES = {
+    "predict_single": bench_predict_single,
+    "predict_batch": bench_predict_batch,
+    "data_quality_metrics": bench_data_quality_metrics,
+    "student_data_pagination": bench_student_data_pagination,
+    "data_page_render": bench_data_page,
+    "send_invitations": bench_send_invitations,
+    "csv_upload": bench_csv_upload,
+    "bulk_ingest": bench_bulk_ingest,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=fixtures.WEB_APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(profile: str = "quick", database_url: str = None, only=None, upload_sizes=None) -> dict:
+    settings = dict(PROFILES[profile])
+    if upload_sizes:
+        settings["upload_sizes"] = upload_sizes
+
+    with fixtures.WebhookStub() as webhook:
+        database_url = fixtures.configure_environment(database_url, webhook.url)
+        from fastapi.testclient import TestClient
+
+        fixtures.reset_database()
+        seeded = fixtures.seed_students(settings["seed_rows"])
+        from app.main import app
+
+        results = {}
+        with TestClient(app) as client:
+            ctx = dict(settings, client=client, webhook=webhook)
+            for name, case in CASES.items():
+                if only and name not in only:
+                    continue
+                print(f"running {name}...", file=sys.stderr)
+                results[name] = case(ctx)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0],
+            "profile": profile,
+            "seed_rows": seeded,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the application's hot paths.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--database-url", default=None, help="Defaults to a throwaway SQLite file.")
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), help="Run a subset of cases.")
+    parser.add_argument("--upload-sizes", type=lambda v: [int(x) for x in v.split(",")], default=None,
+                        help="Comma-separated CSV sizes, e.g. 1000,100000")
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    result = run(args.profile, args.database_url, args.only, args.upload_sizes)
+    payload = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())